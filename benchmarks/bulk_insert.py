@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Measures the time to create and persist a batch of places with one
+save per object, inside a transaction and through storage.add_many().
+
+Usage: ./benchmarks/bulk_insert.py [size ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def build(size):
+    """Yields size new places"""
+    for number in range(size):
+        place = Place()
+        place.city_id = "c1"
+        place.price_by_night = number % 500
+        yield place
+
+
+def one_save_each(size):
+    """Saves after every new place, like BaseModel.save()"""
+    for place in build(size):
+        storage.save()
+
+
+def transaction(size):
+    """Saves once at commit"""
+    with storage.transaction():
+        one_save_each(size)
+
+
+def add_many(size):
+    """Indexes and saves the whole batch at once"""
+    storage.add_many(build(size))
+
+
+def main(sizes):
+    methods = (one_save_each, transaction, add_many)
+    header = "".join(f" {method.__name__ + ' (s)':>18}" for method in methods)
+    print(f"{'objects':>10}{header}")
+    for size in sizes:
+        row = []
+        for method in methods:
+            FileStorage._FileStorage__objects = {}
+            start = time.perf_counter()
+            # one save per object grows quadratically, skip it when large
+            if method is one_save_each and size > 5000:
+                row.append(None)
+                continue
+            method(size)
+            row.append(time.perf_counter() - start)
+        cells = "".join(f" {'-' if seconds is None else f'{seconds:.3f}':>18}"
+                        for seconds in row)
+        print(f"{size:>10}{cells}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 5000, 50000])
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Measures the memory held and the time taken by random get() calls
+after a reload, against the size of the object cache. Most calls
+fetch a small set of popular places.
+
+Usage: ./benchmarks/cache.py [size [cache_size ...]]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def main(size, cache_sizes, lookups=20000):
+    places = [Place() for _ in range(size)]
+    storage.save()
+    ids = [place.id for place in places]
+    del places
+    popular = ids[:size // 100 or 1]
+    rng = random.Random(0)
+    keys = [rng.choice(popular) if rng.random() < 0.9 else rng.choice(ids)
+            for _ in range(lookups)]
+    print(f"{size} places, {lookups} gets")
+    print(f"{'cache':>8} {'reload (s)':>11} {'gets (s)':>9} {'peak (MiB)':>11}"
+          f" {'hit rate':>9} {'evictions':>10} {'writes':>8}")
+    for cache_size in cache_sizes:
+        FileStorage._cache_size = cache_size
+        FileStorage._FileStorage__cache_stats = dict.fromkeys(
+            ("hits", "misses", "evictions", "writes"), 0)
+        FileStorage._FileStorage__objects = {}
+        tracemalloc.start()
+        start = time.perf_counter()
+        storage.reload()
+        reload = time.perf_counter() - start
+        start = time.perf_counter()
+        for obj_id in keys:
+            storage.get(Place, obj_id)
+        gets = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+        tracemalloc.stop()
+        stats = storage.cache_stats()
+        # get() only counts hits and misses with the cache on
+        rate = f"{stats['hits'] / lookups:.1%}" if cache_size else "-"
+        print(f"{cache_size or 'off':>8} {reload:>11.3f} {gets:>9.3f}"
+              f" {peak:>11.1f} {rate:>9} {stats['evictions']:>10}"
+              f" {stats['writes']:>8}")
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    main(size, [int(arg) for arg in sys.argv[2:]] or [0, 5000, 1000])
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""
+Compares the file size and the encode and decode throughput of the
+JSON and binary codecs on a dataset shaped like a listings site:
+states, cities, users, amenities, places and reviews referencing
+each other.
+
+Usage: ./benchmarks/codec.py [places]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.base_model import BaseModel
+from models.amenity import Amenity
+from models.city import City
+from models.engine import codec
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+WORDS = ("quiet bright spacious cosy central modern garden view terrace "
+         "kitchen parking beach walk metro family pets wifi pool").split()
+
+
+def sentence(rng, size):
+    """Returns size random words"""
+    return " ".join(rng.choice(WORDS) for _ in range(size))
+
+
+def dataset(places):
+    """Yields a dataset with the given number of places"""
+    rng = random.Random(0)
+    states = [State() for _ in range(50)]
+    cities = [City() for _ in range(places // 20 or 1)]
+    users = [User() for _ in range(places // 4 or 1)]
+    amenities = [Amenity() for _ in range(30)]
+    for number, state in enumerate(states):
+        state.name = f"State {number}"
+    for number, city in enumerate(cities):
+        city.state_id = rng.choice(states).id
+        city.name = f"City {number}"
+    for user in users:
+        user.email = f"{user.id[:8]}@example.com"
+        user.first_name = rng.choice(WORDS).title()
+        user.last_name = rng.choice(WORDS).title()
+    for amenity in amenities:
+        amenity.name = rng.choice(WORDS)
+    yield from states + cities + users + amenities
+    for _ in range(places):
+        place = Place()
+        place.city_id = rng.choice(cities).id
+        place.user_id = rng.choice(users).id
+        place.name = sentence(rng, 3)
+        place.description = sentence(rng, 25)
+        place.number_rooms = rng.randint(1, 6)
+        place.number_bathrooms = rng.randint(1, 3)
+        place.max_guest = rng.randint(1, 10)
+        place.price_by_night = rng.randint(30, 400)
+        place.latitude = rng.uniform(-60, 60)
+        place.longitude = rng.uniform(-180, 180)
+        place.amenity_ids = [amenity.id for amenity
+                             in rng.sample(amenities, rng.randint(0, 8))]
+        yield place
+        for _ in range(rng.randint(0, 3)):
+            review = Review()
+            review.place_id = place.id
+            review.user_id = rng.choice(users).id
+            review.text = sentence(rng, 30)
+            yield review
+
+
+def best(func, repeat=3):
+    """Returns the result and the best wall time of func"""
+    elapsed = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        took = time.perf_counter() - start
+        elapsed = took if elapsed is None else min(elapsed, took)
+    return result, elapsed
+
+
+def load(current, data):
+    """Decodes data and builds its instances"""
+    registry = BaseModel.registry
+    return [registry[key.split(".", 1)[0]].from_dict(value)
+            for key, value in current.decode(data).items()]
+
+
+def main(places):
+    storage.add_many(dataset(places))
+    objects = storage.all()
+    count = len(objects)
+    print(f"{count} objects")
+    print(f"{'codec':>8} {'size (KiB)':>12} {'encode (obj/s)':>16} "
+          f"{'decode (obj/s)':>16} {'decode + build (obj/s)':>24}")
+    for name, current in codec.CODECS.items():
+        data, encoding = best(lambda: current.encode(objects))
+        _, decoding = best(lambda: current.decode(data))
+        _, loading = best(lambda: load(current, data))
+        print(f"{name:>8} {len(data) / 1024:>12.0f} {count / encoding:>16.0f} "
+              f"{count / decoding:>16.0f} {count / loading:>24.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
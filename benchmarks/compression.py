@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""
+Measures the bytes written, the save time and the reload time of the
+storage file for each compression and level, with the JSON and the
+binary codecs, on the dataset of benchmarks/codec.py.
+
+Usage: ./benchmarks/compression.py [places]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from codec import dataset
+from models import storage
+from models.engine.file_storage import FileStorage
+
+SETTINGS = [(None, -1)] + [("zlib", level) for level in (1, 6, 9)] + \
+    [("gzip", level) for level in (1, 6, 9)] + \
+    [("lzma", level) for level in (0, 6, 9)]
+
+
+def main(places):
+    storage.add_many(dataset(places))
+    print(f"{storage.count()} objects")
+    print(f"{'codec':>7} {'compression':>12} {'KiB':>8} {'save (s)':>9} "
+          f"{'reload (s)':>11}")
+    for name in ("json", "binary"):
+        FileStorage._codec = name
+        for compression, level in SETTINGS:
+            FileStorage._compression = compression
+            FileStorage._compression_level = level
+            start = time.perf_counter()
+            storage.compact()
+            saved = time.perf_counter() - start
+            size = os.path.getsize(FileStorage._file_path)
+            FileStorage._FileStorage__objects = {}
+            start = time.perf_counter()
+            storage.reload()
+            reloaded = time.perf_counter() - start
+            label = f"{compression}:{level}" if compression else "none"
+            print(f"{name:>7} {label:>12} {size / 1024:>8.0f} {saved:>9.3f} "
+                  f"{reloaded:>11.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
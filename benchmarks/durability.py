@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.save_to_file() latency for each durability level,
+for a full rewrite of file.json and for a journal append of one change.
+
+Usage: ./benchmarks/durability.py [size ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+LEVELS = ("none", "file", "dir")
+
+
+def timed(func, repeat=5):
+    """Returns the median wall time of func over repeat runs"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def main(sizes):
+    header = "".join(f" {level + ' (ms)':>12}" for level in LEVELS)
+    print(f"{'objects':>10} {'mode':>8}{header}")
+    for size in sizes:
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        places = [Place() for _ in range(size)]
+        for place in places:
+            place.name = "Cosy loft"
+
+        def save_one_dirty():
+            places[0].price_by_night += 1
+            storage.save_to_file()
+
+        for journaling in (False, True):
+            FileStorage._journaling = journaling
+            row = []
+            for level in LEVELS:
+                FileStorage._durability = level
+                storage.compact()
+                row.append(timed(save_one_dirty))
+            mode = "journal" if journaling else "rewrite"
+            cells = "".join(f" {seconds * 1000:>12.2f}" for seconds in row)
+            print(f"{size:>10} {mode:>8}{cells}")
+        FileStorage._journaling = False
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""
+Measures the per-object cost of building a Place from its dictionary:
+the former setattr and strptime loop of BaseModel.__init__, the
+from_dict() constructor, and a whole FileStorage.reload().
+
+Usage: ./benchmarks/from_dict.py [size]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def setattr_strptime(obj_dict):
+    """Builds a Place the way BaseModel.__init__ used to"""
+    obj = Place.__new__(Place)
+    for key, value in obj_dict.items():
+        if key == "__class__":
+            continue
+        elif key in ["created_at", "updated_at"]:
+            setattr(obj, key,
+                    datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f"))
+        else:
+            setattr(obj, key, value)
+    return obj
+
+
+def per_object(func, dicts):
+    """Returns the best time per object in microseconds of func"""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for obj_dict in dicts:
+            func(obj_dict)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(dicts) * 1e6
+
+
+def main(size):
+    storage.add_many(Place() for _ in range(size))
+    dicts = [obj.to_dict() for obj in storage.all(Place).values()]
+    print(f"{'setattr + strptime':>20} {per_object(setattr_strptime, dicts):8.2f} us")
+    print(f"{'from_dict':>20} {per_object(Place.from_dict, dicts):8.2f} us")
+    FileStorage._FileStorage__objects = {}
+    start = time.perf_counter()
+    storage.reload()
+    elapsed = time.perf_counter() - start
+    print(f"{'reload':>20} {elapsed / size * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
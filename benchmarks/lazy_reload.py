@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.reload() and the first save after it with and
+without lazy materialization, when a single object is accessed.
+
+Usage: ./benchmarks/lazy_reload.py [size ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def main(sizes):
+    print(f"{'objects':>10} {'mode':>6} {'reload (s)':>12} {'save (s)':>10}")
+    for size in sizes:
+        FileStorage._FileStorage__objects = {}
+        places = [Place() for _ in range(size)]
+        storage.add_many(places)
+        for lazy in (False, True):
+            FileStorage._lazy = lazy
+            FileStorage._FileStorage__objects = {}
+            start = time.perf_counter()
+            storage.reload()
+            reloaded = time.perf_counter() - start
+            storage.get(Place, places[0].id).name = "Loft"
+            start = time.perf_counter()
+            storage.save()
+            saved = time.perf_counter() - start
+            mode = "lazy" if lazy else "eager"
+            print(f"{size:>10} {mode:>6} {reloaded:>12.3f} {saved:>10.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
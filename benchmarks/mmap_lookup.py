@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+"""
+Measures the time and Python memory needed to reload the store and
+fetch one object by id, from a JSON snapshot read eagerly or lazily
+and from an indexed snapshot mapped with mmap.
+
+Usage: ./benchmarks/mmap_lookup.py [size]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+MODES = (("json", False), ("json", True), ("indexed", False))
+
+
+def main(size):
+    places = [Place() for _ in range(size)]
+    for place in places:
+        place.description = "A quiet room close to the station " * 4
+    storage.add_many(places)
+    wanted = places[size // 2].id
+    print(f"{'snapshot':>10} {'lazy':>5} {'reload (ms)':>12} "
+          f"{'get (ms)':>9} {'peak (MiB)':>11}")
+    for name, lazy in MODES:
+        FileStorage._codec = name
+        FileStorage._lazy = lazy
+        storage.compact()
+        FileStorage._FileStorage__objects = {}
+        tracemalloc.start()
+        start = time.perf_counter()
+        storage.reload()
+        reloaded = time.perf_counter() - start
+        start = time.perf_counter()
+        assert storage.get(Place, wanted).id == wanted
+        fetched = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:>10} {str(lazy):>5} {reloaded * 1000:>12.1f} "
+              f"{fetched * 1000:>9.2f} {peak / 2 ** 20:>11.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+Measures the time to save one changed object and to reload the
+snapshot, serially and in worker processes, with the json and the
+ndjson codecs.
+
+Usage: ./benchmarks/ndjson.py [size [workers]]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def timed(function):
+    """Returns the seconds taken by function()"""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main(size, workers):
+    places = [Place() for _ in range(size)]
+    print(f"{size} places, {workers} workers")
+    print(f"{'codec':>8} {'save one (ms)':>14} {'reload (s)':>11}"
+          f" {'parallel (s)':>13}")
+    FileStorage._parallel_min_size = 0
+    for name in ("json", "ndjson"):
+        FileStorage._codec = name
+        storage.save()
+
+        def save_one():
+            places[0].price_by_night += 1
+            storage.save()
+
+        save = min(timed(save_one) for _ in range(20))
+        FileStorage._workers = 0
+        FileStorage._FileStorage__objects = {}
+        serial = timed(storage.reload)
+        assert storage.count(Place) == size
+        FileStorage._workers = workers
+        FileStorage._FileStorage__objects = {}
+        parallel = timed(storage.reload)
+        assert storage.count(Place) == size
+        places = list(storage.all(Place).values())
+        print(f"{name:>8} {save * 1000:>14.2f} {serial:>11.3f}"
+              f" {parallel:>13.3f}")
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    main(size, max(workers, 2))
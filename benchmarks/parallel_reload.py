@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.reload() time against the number of worker
+processes building the objects.
+
+The workers send the objects they built back to the parent, which
+unpickles them one at a time and then indexes them. Both steps are
+serial, so the reload time never drops below the unpickling time,
+printed as the floor, whatever the number of workers. Decoding the
+JSON and calling from_dict() on 100,000 places takes about 0.6 s,
+against about 0.4 s to unpickle them: building the objects gets at
+most about 1.5x faster.
+
+Usage: ./benchmarks/parallel_reload.py [size [workers ...]]
+"""
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def main(size, workers):
+    storage.add_many(Place() for _ in range(size))
+    print(f"{size} places, {os.path.getsize(FileStorage._file_path)} bytes")
+    print(f"{'workers':>8} {'reload (s)':>12}")
+    FileStorage._parallel_min_size = 0
+    for count in workers:
+        FileStorage._workers = count
+        FileStorage._FileStorage__objects = {}
+        start = time.perf_counter()
+        storage.reload()
+        elapsed = time.perf_counter() - start
+        assert storage.count(Place) == size
+        print(f"{count:>8} {elapsed:>12.3f}")
+    data = pickle.dumps(storage.all(Place), pickle.HIGHEST_PROTOCOL)
+    start = time.perf_counter()
+    pickle.loads(data)
+    print(f"{'floor':>8} {time.perf_counter() - start:>12.3f}"
+          "  (unpickling the objects in the parent)")
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    workers = [int(arg) for arg in sys.argv[2:]] or \
+        sorted({1, 2, 4, os.cpu_count() or 1})
+    main(size, workers)
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Measures the RangeIndex used by storage.range() on Place.price_by_night:
+bulk rebuild, incremental updates and range queries, against a scan of
+every object.
+
+Usage: ./benchmarks/range_index.py [places]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.engine.indexes import RangeIndex
+
+
+class Record:
+    """Stand-in for a Place with only what the index reads"""
+
+    def __init__(self, obj_id, price_by_night):
+        self.id = obj_id
+        self.price_by_night = price_by_night
+
+
+def main(size):
+    rng = random.Random(0)
+    records = [Record(str(i), rng.randint(10, 1000)) for i in range(size)]
+    index = RangeIndex("price_by_night")
+
+    start = time.perf_counter()
+    index.rebuild(records)
+    print(f"rebuild {size} places:        {time.perf_counter() - start:8.3f} s")
+
+    moved = rng.sample(records, 10000)
+    start = time.perf_counter()
+    for record in moved:
+        record.price_by_night = rng.randint(10, 1000)
+        index.update(record)
+    elapsed = time.perf_counter() - start
+    print(f"update (per object):          {elapsed / len(moved) * 1e6:8.2f} us")
+
+    for low, high in ((100, 100), (100, 109), (100, 199)):
+        queries = 100
+        start = time.perf_counter()
+        for _ in range(queries):
+            found = index.range(low, high)
+        indexed = (time.perf_counter() - start) / queries
+        start = time.perf_counter()
+        scanned = [r.id for r in records if low <= r.price_by_night <= high]
+        scan = time.perf_counter() - start
+        assert len(scanned) == len(found)
+        print(f"range({low}, {high}) -> {len(found):7} ids: "
+              f"{indexed * 1000:8.3f} ms indexed, {scan * 1000:8.1f} ms scan")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""
+Measures peak memory and wall time of FileStorage.reload() on a
+synthetic file.json, with and without streaming.
+
+Usage: ./benchmarks/reload_memory.py [size_mb]
+
+Each mode runs in its own interpreter so that peak RSS is not shared.
+Pass a few thousand MB to reproduce the multi-GB case.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def generate(path, size_mb):
+    """Writes a file.json of about size_mb megabytes of Place objects"""
+    limit = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("{")
+        separator = ""
+        while written < limit:
+            obj_id = str(uuid.uuid4())
+            value = {"id": obj_id, "created_at": "2024-05-19T21:10:39.091088",
+                     "updated_at": "2024-05-19T21:10:39.091088",
+                     "__class__": "Place", "city_id": str(uuid.uuid4()),
+                     "name": "Cosy loft", "description": "Near the beach " * 4,
+                     "price_by_night": 120, "max_guest": 4}
+            line = f'{separator}"Place.{obj_id}": {json.dumps(value)}'
+            file.write(line)
+            written += len(line)
+            separator = ", "
+        file.write("}")
+
+
+def measure():
+    """Reloads file.json in the current directory and reports usage"""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    from models import storage
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"objects": len(storage.all()), "seconds": elapsed,
+                      "peak_mb": (peak - baseline) / 1024}))
+
+
+def main(size_mb):
+    workdir = tempfile.mkdtemp()
+    generate(os.path.join(workdir, "file.json"), size_mb)
+    print(f"{'mode':>10} {'objects':>10} {'seconds':>9} {'peak MB':>9}")
+    for mode, streaming in (("json.load", "0"), ("streaming", "1")):
+        env = dict(os.environ, HBNB_STORAGE_STREAM=streaming)
+        out = subprocess.run([sys.executable, __file__, "--measure"],
+                             cwd=workdir, env=env, check=True,
+                             capture_output=True, text=True).stdout
+        result = json.loads(out)
+        print(f"{mode:>10} {result['objects']:>10} "
+              f"{result['seconds']:>9.2f} {result['peak_mb']:>9.1f}")
+    os.remove(os.path.join(workdir, "file.json"))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--measure"]:
+        measure()
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.save_to_file() latency against store size when
+a single object changed since the previous save, next to the cost of
+a save that has to encode every object.
+
+Usage: ./benchmarks/save_latency.py [size ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def timed(func, repeat=5):
+    """Returns the best wall time of func over repeat runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(sizes):
+    print(f"{'objects':>10} {'all dirty (ms)':>16} {'1 dirty (ms)':>14}")
+    for size in sizes:
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        places = [Place() for _ in range(size)]
+        for place in places:
+            place.name = "Cosy loft"
+            place.price_by_night = 120
+
+        def save_all_dirty():
+            FileStorage._FileStorage__fragments = {}
+            storage.save_to_file()
+
+        def save_one_dirty():
+            places[0].price_by_night += 1
+            storage.save_to_file()
+
+        cold = timed(save_all_dirty)
+        warm = timed(save_one_dirty)
+        print(f"{size:>10} {cold * 1000:>16.2f} {warm * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
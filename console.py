@@ -3,6 +3,7 @@
 Console module for the HBNB project.
 """
 import cmd
+import copy
 import re
 import shlex
 import ast
@@ -51,12 +52,30 @@ def split_curly_braces(e_arg):
             return f"{id}", f"{attr_name} {attr_value}"
 
 
+def split_parameters(arg):
+    """
+    Splits the arguments of the create method on the spaces outside of
+    quotes. The quotes are kept, so that a value such as ["a"] is still
+    a Python literal once split.
+    """
+    return re.findall(r"""(?:"(?:\\.|[^"\\])*"|'[^']*'|[^\s"'])+""", arg)
+
+
+def unquote(value):
+    """
+    Removes the quotes around a value of the create method.
+    """
+    if len(value) > 1 and value[0] in "\"'" and value[-1] == value[0]:
+        return shlex.split(value)[0]
+    return value
+
+
 class HBNBConsole(cmd.Cmd):
     """
     Command interpreter class for HBNB.
     """
     prompt = "(hbnb) "
-    valid_classes = ["BaseModel", "User", "Amenity", "Place", "Review", "State", "City"]
+    valid_classes = BaseModel.registry
 
     def emptyline(self):
         """
@@ -78,19 +97,50 @@ class HBNBConsole(cmd.Cmd):
 
     def do_create(self, arg):
         """
-        Create a new instance of a class and save it to the JSON file.
-        Usage: create <class_name>
+        Create new instances of a class and save them to the JSON file.
+        Usage: create <class_name> [<count>] [<attribute>=<value> ...]
         """
-        arguments = shlex.split(arg)
+        arguments = split_parameters(arg)
 
         if len(arguments) == 0:
             print("** class name missing **")
         elif arguments[0] not in self.valid_classes:
             print("** class doesn't exist **")
         else:
-            new_instance = eval(f"{arguments[0]}()")
-            storage.save()
-            print(new_instance.id)
+            cls = self.valid_classes[arguments[0]]
+            count = 1
+            if len(arguments) > 1 and arguments[1].isdigit():
+                count = int(arguments.pop(1))
+                if count < 1:
+                    print("** count must be at least 1 **")
+                    return
+            attributes = {}
+            for parameter in arguments[1:]:
+                attr_name, sep, attr_value = parameter.partition("=")
+                if not sep or not attr_name:
+                    print(f"** invalid parameter: {parameter} **")
+                    return
+                try:
+                    attributes[attr_name] = cls.coerce(attr_name,
+                                                       unquote(attr_value))
+                except ValueError:
+                    print("** invalid value **")
+                    return
+
+            new_ids = []
+
+            def build():
+                for _ in range(count):
+                    new_instance = cls()
+                    for attr_name, attr_value in attributes.items():
+                        setattr(new_instance, attr_name,
+                                copy.deepcopy(attr_value))
+                    new_ids.append(new_instance.id)
+                    yield new_instance
+
+            storage.add_many(build())
+            for new_id in new_ids:
+                print(new_id)
 
     def do_show(self, arg):
         """
@@ -106,10 +156,9 @@ class HBNBConsole(cmd.Cmd):
         elif len(arguments) < 2:
             print("** instance id missing **")
         else:
-            objects = storage.all()
-            key = "{}.{}".format(arguments[0], arguments[1])
-            if key in objects:
-                print(objects[key])
+            obj = storage.get(arguments[0], arguments[1])
+            if obj is not None:
+                print(obj)
             else:
                 print("** no instance found **")
 
@@ -127,10 +176,9 @@ class HBNBConsole(cmd.Cmd):
         elif len(arguments) < 2:
             print("** instance id missing **")
         else:
-            objects = storage.all()
-            key = "{}.{}".format(arguments[0], arguments[1])
-            if key in objects:
-                del objects[key]
+            obj = storage.get(arguments[0], arguments[1])
+            if obj is not None:
+                storage.delete(obj)
                 storage.save()
             else:
                 print("** no instance found **")
@@ -140,43 +188,82 @@ class HBNBConsole(cmd.Cmd):
         Print the string representation of all instances or a specific class.
         Usage: <class_name>.all()
         """
-        objects = storage.all()
         arguments = shlex.split(arg)
 
         if len(arguments) == 0:
-            for obj in objects.values():
+            for obj in storage.all().values():
                 print(obj)
         elif arguments[0] not in self.valid_classes:
             print("** class doesn't exist **")
         else:
-            for obj in objects.values():
-                if obj.__class__.__name__ == arguments[0]:
-                    print(obj)
+            for obj in storage.all(arguments[0]).values():
+                print(obj)
 
     def do_count(self, arg):
         """
         Count the number of instances of a class.
         Usage: <class_name>.count()
         """
-        objects = storage.all()
         arguments = shlex.split(arg)
 
         if arg:
             class_name = arguments[0]
 
-        count = 0
-
         if arguments:
             if class_name in self.valid_classes:
-                for obj in objects.values():
-                    if obj.__class__.__name__ == class_name:
-                        count += 1
-                print(count)
+                print(storage.count(class_name))
             else:
                 print("** class doesn't exist **")
         else:
             print("** class name missing **")
 
+    def do_search(self, arg):
+        """
+        Print the instances matching words, best matches first.
+        Usage: search [<class_name>] <word> [<word> ...]
+        All the words must match unless they are separated by OR.
+        """
+        arguments = shlex.split(arg)
+        class_name = None
+
+        if arguments and arguments[0] in self.valid_classes:
+            class_name = arguments.pop(0)
+
+        if not arguments:
+            print("** search words missing **")
+        else:
+            mode = "or" if "OR" in arguments else "and"
+            words = " ".join(word for word in arguments if word != "OR")
+            for obj in storage.search(words, class_name, mode):
+                print(obj)
+
+    def do_begin(self, arg):
+        """
+        Start a transaction: saves are held back until commit.
+        Usage: begin
+        """
+        storage.begin()
+
+    def do_commit(self, arg):
+        """
+        Save every change made since begin at once.
+        Usage: commit
+        """
+        try:
+            storage.commit()
+        except RuntimeError:
+            print("** no transaction in progress **")
+
+    def do_rollback(self, arg):
+        """
+        Undo every change made since begin.
+        Usage: rollback
+        """
+        try:
+            storage.rollback()
+        except RuntimeError:
+            print("** no transaction in progress **")
+
     def do_update(self, arg):
         """
         Update an instance by adding or updating an attribute.
@@ -191,16 +278,14 @@ class HBNBConsole(cmd.Cmd):
         elif len(arguments) < 2:
             print("** instance id missing **")
         else:
-            objects = storage.all()
-            key = "{}.{}".format(arguments[0], arguments[1])
-            if key not in objects:
+            obj = storage.get(arguments[0], arguments[1])
+            if obj is None:
                 print("** no instance found **")
             elif len(arguments) < 3:
                 print("** attribute name missing **")
             elif len(arguments) < 4:
                 print("** value missing **")
             else:
-                obj = objects[key]
                 curly_braces = re.search(r"\{(.*?)\}", arg)
 
                 if curly_braces:
@@ -213,11 +298,11 @@ class HBNBConsole(cmd.Cmd):
                         pass
                 else:
                     attr_name = arguments[2]
-                    attr_value = arguments[3]
                     try:
-                        attr_value = eval(attr_value)
-                    except Exception:
-                        pass
+                        attr_value = obj.coerce(attr_name, arguments[3])
+                    except ValueError:
+                        print("** invalid value **")
+                        return
                     setattr(obj, attr_name, attr_value)
 
                 obj.save()
@@ -237,7 +322,8 @@ class HBNBConsole(cmd.Cmd):
             'show': self.do_show,
             'destroy': self.do_destroy,
             'update': self.do_update,
-            'count': self.do_count
+            'count': self.do_count,
+            'search': self.do_search
         }
 
         if cmd_method in method_dict:
@@ -1,10 +1,18 @@
 #!/usr/bin/python3
 """
 Initialize the package
+
+The storage engine is selected with HBNB_TYPE_STORAGE:
+"db" for the SQLite DBStorage, anything else for FileStorage.
 """
+import os
 from models.engine.file_storage import FileStorage
 
 
-storage = FileStorage()
+if os.getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage()
+else:
+    storage = FileStorage()
 
 storage.reload()
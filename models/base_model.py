@@ -2,6 +2,8 @@
 """
 This is the Base Model
 """
+import ast
+import sys
 import uuid
 from datetime import datetime
 import models
@@ -10,21 +12,22 @@ import models
 class BaseModel:
     """
     Class of BaseModel
+
+    registry maps the name of BaseModel and of each of its subclasses
+    to the class, and is filled in as the subclasses are defined.
     """
+    registry = {}
+
+    def __init_subclass__(cls, **kwargs):
+        """Registers a new subclass under its name"""
+        super().__init_subclass__(**kwargs)
+        BaseModel.registry[cls.__name__] = cls
 
     def __init__(self, *args, **kwargs):
         """Initializes a new instance of BaseModel"""
 
-        t_format = "%Y-%m-%dT%H:%M:%S.%f"
-
         if kwargs:
-            for key, value in kwargs.items():
-                if key == "__class__":
-                    continue
-                elif key in ["created_at", "updated_at"]:
-                    setattr(self, key, datetime.strptime(value, t_format))
-                else:
-                    setattr(self, key, value)
+            self._load(kwargs)
         else:
             self.id = str(uuid.uuid4())
             self.created_at = datetime.utcnow()
@@ -32,6 +35,59 @@ class BaseModel:
 
         models.storage.add(self)
 
+    @classmethod
+    def from_dict(cls, obj_dict):
+        """
+        Builds an instance from a dictionary made by to_dict(),
+        without running __init__ nor adding it to the storage
+        """
+        obj = cls.__new__(cls)
+        obj._load(obj_dict)
+        return obj
+
+    @classmethod
+    def coerce(cls, name, value):
+        """
+        Converts a string typed by a user to the type of the class
+        attribute name: int, float, list or str. For attributes the
+        class does not declare, a Python literal is converted to its
+        value and anything else is kept as a string. Raises ValueError
+        if value is not a number for an int or float attribute.
+        """
+        if not isinstance(value, str):
+            return value
+        default = getattr(cls, name, None)
+        if isinstance(default, (int, float)):
+            return type(default)(value)
+        try:
+            if isinstance(default, str):
+                return value
+            literal = ast.literal_eval(value)
+        except (ValueError, SyntaxError, TypeError, MemoryError,
+                RecursionError):
+            return value
+        if isinstance(default, list) and not isinstance(literal, list):
+            return value
+        return literal
+
+    def _load(self, obj_dict):
+        """Fills the attributes from a dictionary made by to_dict()"""
+        attributes = self.__dict__
+        # the parsers give each record its own key strings, share them
+        # across instances as setattr() would
+        attributes.update(zip(map(sys.intern, obj_dict), obj_dict.values()))
+        attributes.pop("__class__", None)
+        for key in ("created_at", "updated_at"):
+            if key in attributes and \
+                    not isinstance(attributes[key], datetime):
+                attributes[key] = datetime.fromisoformat(attributes[key])
+
+    def __setattr__(self, name, value):
+        """Sets an attribute and flags the instance as changed"""
+        models.storage.attribute_changing(self, name)
+        super().__setattr__(name, value)
+        models.storage.attribute_changed(self, name)
+
     def __str__(self):
         """Returns a string representation of the instance"""
         class_name = self.__class__.__name__
@@ -39,7 +95,8 @@ class BaseModel:
 
     def save(self):
         """updates the public instance attribute"""
-        self.update_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
+        models.storage.add(self)
         models.storage.save_to_file()
 
     def to_dict(self):
@@ -51,3 +108,6 @@ class BaseModel:
         dict_rep["created_at"] = self.created_at.isoformat()
         dict_rep["updated_at"] = self.updated_at.isoformat()
         return dict_rep
+
+
+BaseModel.registry[BaseModel.__name__] = BaseModel
@@ -2,7 +2,9 @@
 """
 This module defines the City class.
 """
+import models
 from models.base_model import BaseModel
+from models.place import Place
 
 class City(BaseModel):
     """
@@ -15,3 +17,10 @@ class City(BaseModel):
 
     state_id = ""
     name = ""
+
+    _indexes = ("state_id",)
+
+    @property
+    def places(self):
+        """Place instances whose city_id is this city"""
+        return models.storage.related(Place, "city_id", self.id)
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+Module for the on-disk store holding the objects evicted from the
+memory of the storage engines
+"""
+import dbm
+import hashlib
+from collections.abc import MutableMapping
+
+
+class DiskStore:
+    """
+    Keeps the JSON record of evicted objects in a dbm file keyed by
+    <class name>.id, with a digest of each record in memory so that an
+    object evicted again unchanged is not written a second time. The
+    file is created empty when the store is opened.
+    """
+
+    def __init__(self, path):
+        """Creates an empty dbm file at path"""
+        self.__db = dbm.open(path, "n")
+        self.__digests = {}
+
+    def __digest(self, fragment):
+        """Returns the digest of a JSON record"""
+        return hashlib.blake2b(fragment.encode("utf-8"),
+                               digest_size=16).digest()
+
+    def write(self, key, fragment):
+        """Stores the JSON record of key"""
+        self.__db[key] = fragment.encode("utf-8")
+        self.__digests[key] = self.__digest(fragment)
+
+    def read(self, key):
+        """Returns the JSON record of key"""
+        return self.__db[key].decode("utf-8")
+
+    def holds(self, key, fragment):
+        """Tells whether the stored record of key is fragment"""
+        digest = self.__digests.get(key)
+        return digest is not None and digest == self.__digest(fragment)
+
+    def close(self):
+        """Closes the dbm file"""
+        self.__db.close()
+
+
+class DiskRecords(MutableMapping):
+    """
+    The JSON records of the evicted instances of one class, read from a
+    DiskStore on demand. base holds the records of the class that were
+    never materialized, such as those of a lazy or mapped snapshot, and
+    is consulted for the keys that were not evicted.
+    """
+
+    def __init__(self, store, base=None):
+        """Lists no evicted record yet, falling back on base"""
+        self.__store = store
+        self.__keys = set()
+        self.__base = {} if base is None else base
+
+    def __contains__(self, key):
+        """Tells whether key was evicted or is held by base"""
+        return key in self.__keys or key in self.__base
+
+    def __getitem__(self, key):
+        """Returns the JSON record of key"""
+        if key in self.__keys:
+            return self.__store.read(key)
+        return self.__base[key]
+
+    def __setitem__(self, key, fragment):
+        """Writes the JSON record of an evicted object to the store"""
+        self.__store.write(key, fragment)
+        self.__keys.add(key)
+
+    def __delitem__(self, key):
+        """Forgets key, leaving its record in the store"""
+        if key in self.__keys:
+            self.__keys.remove(key)
+        else:
+            del self.__base[key]
+
+    def __iter__(self):
+        """Iterates over the evicted keys, then those of base"""
+        yield from self.__keys
+        yield from self.__base
+
+    def __len__(self):
+        """Returns the number of records"""
+        return len(self.__keys) + len(self.__base)
+
+    def restore(self, key, fragment):
+        """
+        Lists key again without writing it if the store already holds
+        fragment as its record. Returns whether it did.
+        """
+        if self.__store.holds(key, fragment):
+            self.__keys.add(key)
+            return True
+        return False
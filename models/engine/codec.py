@@ -0,0 +1,700 @@
+#!/usr/bin/python3
+"""
+Module for the codecs turning the stored objects into bytes and back,
+and for the compression of the files holding them. Storage files are
+converted with scripts/convert_storage.py.
+"""
+import gzip
+import io
+import json
+import lzma
+import struct
+import zlib
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from models.base_model import BaseModel
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+MAGIC = b"HBNB\x01"
+INDEXED_MAGIC = b"HBNBIDX\x01"
+
+NONE, FALSE, TRUE, INT, FLOAT, STR, UUID, DATETIME, LIST, DICT = range(10)
+
+_DOUBLE = struct.Struct("<d")
+_INT64 = struct.Struct("<q")
+_ENTRY = struct.Struct("<QI")
+_FOOTER = struct.Struct("<QQ")
+
+
+def iter_items(file, chunk_size=1 << 16):
+    """
+    Parses the top-level JSON object in file one member at a time,
+    yielding (key, value) pairs without holding the whole
+    document in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buf, pos, eof
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+        return not eof
+
+    def next_char():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not read_more():
+                return ""
+
+    def next_value():
+        nonlocal pos
+        next_char()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if read_more():
+                    continue
+                raise
+            # a number may go on in the next chunk
+            if end == len(buf) and read_more():
+                continue
+            pos = end
+            return value
+
+    if next_char() != "{":
+        raise ValueError("expected '{' at start of storage file")
+    pos += 1
+    if next_char() == "}":
+        return
+    while True:
+        key = next_value()
+        if next_char() != ":":
+            raise ValueError("expected ':' after key " + repr(key))
+        pos += 1
+        value = next_value()
+        yield key, value
+        char = next_char()
+        pos += 1
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError("expected ',' or '}' after " + repr(key))
+
+
+class JSONCodec:
+    """
+    Encodes the objects as a JSON object keyed by <class name>.id,
+    one object per line, like FileStorage.
+    """
+    name = "json"
+
+    def encode(self, objects):
+        """Returns the bytes of the objects of a dictionary keyed like
+        FileStorage.__objects"""
+        parts = [f"{json.dumps(key)}: {json.dumps(obj.to_dict())}"
+                 for key, obj in objects.items()]
+        if not parts:
+            return b"{}"
+        return ("{\n" + ",\n".join(parts) + "\n}\n").encode("utf-8")
+
+    def decode(self, data):
+        """Returns the attributes of the objects encoded in data,
+        keyed by <class name>.id"""
+        return json.loads(data)
+
+    def items(self, file, start=0, end=None, stream=False):
+        """Returns an iterator of the (key, attributes) pairs of the
+        file opened in binary mode, parsed one object at a time if
+        stream is true. With a byte range, only the objects on the
+        lines starting in it are read, one object per line."""
+        if start or end is not None:
+            return self.__range_items(file, start, end)
+        if stream:
+            return self.__stream_items(file)
+        return iter(json.load(file).items())
+
+    def __stream_items(self, file):
+        """Yields the pairs parsed one object at a time"""
+        with io.TextIOWrapper(file, encoding="utf-8") as text:
+            yield from iter_items(text)
+
+    def __range_items(self, file, start, end):
+        """Yields the pairs on the lines starting in a byte range"""
+        lines = []
+        if start:
+            file.seek(start - 1)
+            file.readline()
+        while end is None or file.tell() < end:
+            line = file.readline()
+            if not line:
+                break
+            line = line.strip()
+            if line not in (b"", b"{", b"}", b"{}"):
+                lines.append(line.rstrip(b","))
+        yield from json.loads(b"{" + b",".join(lines) + b"}").items()
+
+    def fragments(self, file):
+        """Yields the (key, JSON object) pairs of the file opened in
+        binary mode, which must hold one object per line, without
+        parsing the objects"""
+        decoder = json.JSONDecoder()
+        with io.TextIOWrapper(file, encoding="utf-8") as text:
+            text.readline()
+            for line in text:
+                line = line.rstrip()
+                if line in ("", "}"):
+                    continue
+                key, end = decoder.raw_decode(line)
+                if not isinstance(key, str) or line[end:end + 2] != ": ":
+                    raise ValueError(f"expected a key at {line[:40]!r}")
+                yield key, line[end + 2:].rstrip(",")
+
+
+class _WholeFileCodec:
+    """
+    Reads the pairs of a codec that decodes a file in one pass
+    """
+
+    def items(self, file, start=0, end=None, stream=False):
+        """Returns an iterator of the (key, attributes) pairs of the
+        file opened in binary mode, which cannot be read by range"""
+        if start or end is not None:
+            raise ValueError(f"{self.name} files cannot be split")
+        return iter(self.decode(file.read()).items())
+
+
+class BinaryCodec(_WholeFileCodec):
+    """
+    Encodes the objects in a compact binary layout:
+
+        MAGIC
+        class count, then per class: name, field count, field names
+        record count, then per record: class number, field count,
+            then per field: field number, tagged value
+
+    Counts and numbers are unsigned varints and strings are a varint
+    length followed by UTF-8 bytes. A value is a one byte tag followed
+    by: nothing for None and booleans, a zigzag varint for an int, 8
+    bytes for a float, 16 bytes for a string holding a UUID, an int64
+    of microseconds since 1970 for a naive datetime, and its items for
+    a list or a dict with string keys.
+    """
+    name = "binary"
+
+    def encode(self, objects):
+        """Returns the bytes of the objects of a dictionary keyed like
+        FileStorage.__objects"""
+        classes = {}
+        body = bytearray()
+        for obj in objects.values():
+            class_name = obj.__class__.__name__
+            fields = classes.get(class_name)
+            if fields is None:
+                fields = classes[class_name] = (len(classes), {})
+            class_number, names = fields
+            attributes = obj.__dict__
+            _varint(body, class_number)
+            _varint(body, len(attributes))
+            for name, value in attributes.items():
+                number = names.get(name)
+                if number is None:
+                    number = names[name] = len(names)
+                _varint(body, number)
+                _value(body, value)
+        out = bytearray(MAGIC)
+        _varint(out, len(classes))
+        for class_name, (_, names) in classes.items():
+            _string(out, class_name)
+            _varint(out, len(names))
+            for name in names:
+                _string(out, name)
+        _varint(out, len(objects))
+        out += body
+        return bytes(out)
+
+    def decode(self, data):
+        """Returns the attributes of the objects encoded in data,
+        keyed by <class name>.id"""
+        if not data.startswith(MAGIC):
+            raise ValueError("not a binary storage file")
+        reader = _Reader(data, len(MAGIC))
+        classes = []
+        for _ in range(reader.varint()):
+            class_name = reader.string()
+            classes.append((class_name, [reader.string()
+                                         for _ in range(reader.varint())]))
+        objects = {}
+        for _ in range(reader.varint()):
+            class_name, names = classes[reader.varint()]
+            attributes = {}
+            for _ in range(reader.varint()):
+                name = names[reader.varint()]
+                attributes[name] = reader.value()
+            objects[f"{class_name}.{attributes['id']}"] = attributes
+        if reader.pos != len(data):
+            raise ValueError("trailing data after the last record")
+        return objects
+
+
+class IndexedCodec(_WholeFileCodec):
+    """
+    Encodes the objects as JSON records followed by an index of their
+    keys, so that one record can be found without reading the others:
+
+        INDEXED_MAGIC
+        records: key, a space, the JSON object and a newline
+        index: (offset, length) of each record, sorted by key
+        classes: JSON object mapping each class name to the number of
+            its first index entry and its number of entries
+        footer: offsets of the index and of the classes, INDEXED_MAGIC
+    """
+    name = "indexed"
+
+    def encode(self, objects):
+        """Returns the bytes of the objects of a dictionary keyed like
+        FileStorage.__objects"""
+        return self.encode_fragments((key, json.dumps(obj.to_dict()))
+                                     for key, obj in objects.items())
+
+    def encode_fragments(self, fragments):
+        """Returns the bytes of an iterable of (key, JSON object) pairs"""
+        out = bytearray(INDEXED_MAGIC)
+        entries = []
+        for key, fragment in fragments:
+            raw_key = key.encode("utf-8")
+            record = raw_key + b" " + fragment.encode("utf-8")
+            entries.append((raw_key, len(out), len(record)))
+            out += record + b"\n"
+        entries.sort()
+        index_offset = len(out)
+        classes = {}
+        for number, (raw_key, offset, length) in enumerate(entries):
+            class_name = raw_key.split(b".", 1)[0].decode("utf-8")
+            classes.setdefault(class_name, [number, 0])[1] += 1
+            out += _ENTRY.pack(offset, length)
+        classes_offset = len(out)
+        out += json.dumps(classes).encode("utf-8")
+        out += _FOOTER.pack(index_offset, classes_offset) + INDEXED_MAGIC
+        return bytes(out)
+
+    def decode(self, data):
+        """Returns the attributes of the objects encoded in data,
+        keyed by <class name>.id"""
+        return {key: json.loads(fragment) for records
+                in MappedSnapshot(data).classes().values()
+                for key, fragment in records.items()}
+
+
+class MappedSnapshot:
+    """
+    Reads the records of an indexed snapshot from a buffer, such as
+    an mmap of the file, without copying the others.
+    """
+
+    def __init__(self, buffer):
+        """Reads the footer and the classes of the snapshot in buffer"""
+        tail = len(INDEXED_MAGIC) + _FOOTER.size
+        if len(buffer) < len(INDEXED_MAGIC) + tail or \
+                buffer[:len(INDEXED_MAGIC)] != INDEXED_MAGIC or \
+                buffer[-len(INDEXED_MAGIC):] != INDEXED_MAGIC:
+            raise ValueError("not an indexed storage file")
+        self.buffer = buffer
+        self.index_offset, classes_offset = _FOOTER.unpack_from(
+            buffer, len(buffer) - tail)
+        self.__classes = json.loads(bytes(
+            buffer[classes_offset:len(buffer) - tail]))
+
+    def classes(self):
+        """Returns the records of each class, keyed by class name"""
+        return {class_name: MappedRecords(self, first, count)
+                for class_name, (first, count) in self.__classes.items()}
+
+    def entry(self, number):
+        """Returns the offset and length of a record"""
+        return _ENTRY.unpack_from(self.buffer,
+                                  self.index_offset + number * _ENTRY.size)
+
+    def key(self, number):
+        """Returns the key of a record, as bytes"""
+        offset, length = self.entry(number)
+        end = self.buffer.find(b" ", offset, offset + length)
+        return self.buffer[offset:end]
+
+    def fragment(self, number):
+        """Returns the key and JSON object of a record"""
+        offset, length = self.entry(number)
+        record = self.buffer[offset:offset + length]
+        key, _, fragment = bytes(record).partition(b" ")
+        return key.decode("utf-8"), fragment.decode("utf-8")
+
+
+class MappedRecords(MutableMapping):
+    """
+    The JSON objects of one class of a MappedSnapshot, keyed like
+    FileStorage.__objects. Keys are found by a binary search of the
+    index. Records can be removed from the mapping but not added.
+    """
+
+    def __init__(self, snapshot, first, count):
+        """Maps the count records from index entry first"""
+        self.__snapshot = snapshot
+        self.__first = first
+        self.__count = count
+        self.__removed = set()
+
+    def __find(self, key):
+        """Returns the index entry of key, or None"""
+        raw_key = key.encode("utf-8")
+        snapshot = self.__snapshot
+        low, high = self.__first, self.__first + self.__count
+        while low < high:
+            middle = (low + high) // 2
+            if snapshot.key(middle) < raw_key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.__first + self.__count and \
+                snapshot.key(low) == raw_key:
+            return low
+        return None
+
+    def __contains__(self, key):
+        """Tells whether key is mapped"""
+        return isinstance(key, str) and key not in self.__removed and \
+            self.__find(key) is not None
+
+    def __getitem__(self, key):
+        """Returns the JSON object of key"""
+        number = None if key in self.__removed else self.__find(key)
+        if number is None:
+            raise KeyError(key)
+        return self.__snapshot.fragment(number)[1]
+
+    def __setitem__(self, key, fragment):
+        """Records cannot be added to a snapshot"""
+        raise TypeError("mapped records are read-only")
+
+    def __delitem__(self, key):
+        """Removes key from the mapping, leaving the snapshot as is"""
+        if key not in self:
+            raise KeyError(key)
+        self.__removed.add(key)
+
+    def __iter__(self):
+        """Iterates over the keys in sorted order"""
+        for key, _ in self.items():
+            yield key
+
+    def __len__(self):
+        """Returns the number of mapped records"""
+        return self.__count - len(self.__removed)
+
+    def items(self):
+        """Iterates over the (key, JSON object) pairs in key order"""
+        for number in range(self.__first, self.__first + self.__count):
+            key, fragment = self.__snapshot.fragment(number)
+            if key not in self.__removed:
+                yield key, fragment
+
+
+class NDJSONCodec:
+    """
+    Encodes the objects as one {"key": <class name>.id, "value": object}
+    record per line. Records can be appended to the end of such a
+    file: the last record of a key wins and a null value deletes it.
+    """
+    name = "ndjson"
+
+    def encode(self, objects):
+        """Returns the bytes of the objects of a dictionary keyed like
+        FileStorage.__objects"""
+        return self.encode_fragments((key, json.dumps(obj.to_dict()))
+                                     for key, obj in objects.items())
+
+    def encode_fragments(self, fragments):
+        """Returns the bytes of an iterable of (key, JSON object) pairs"""
+        return "".join(self.record(key, fragment)
+                       for key, fragment in fragments).encode("utf-8")
+
+    def record(self, key, fragment):
+        """Returns the line storing the JSON object fragment under key,
+        or deleting key if fragment is None"""
+        if fragment is None:
+            fragment = "null"
+        return '{"key": %s, "value": %s}\n' % (json.dumps(key), fragment)
+
+    def decode(self, data):
+        """Returns the attributes of the objects encoded in data,
+        keyed by <class name>.id"""
+        objects = {}
+        for key, value in self.items(io.BytesIO(data)):
+            if value is None:
+                objects.pop(key, None)
+            else:
+                objects[key] = value
+        return objects
+
+    def items(self, file, start=0, end=None, stream=False):
+        """Yields the (key, attributes) pairs of the records of the
+        file opened in binary mode, in order and always one at a time,
+        with None as the attributes of a deleted key. With a byte
+        range, only the lines starting in it are read."""
+        for key, value, _ in read_records(file, start, end):
+            yield key, value
+
+
+def read_records(file, start=0, end=None):
+    """
+    Yields the (key, value, offset) of the records of an NDJSON file
+    opened in binary mode whose line starts between the byte offsets
+    start and end, offset being where the next line starts. A start
+    inside a line skips to the next one, so the offset of the last
+    record read resumes the reading right after it. An unterminated
+    last line, such as an append in progress, is not read.
+    """
+    if start:
+        file.seek(start - 1)
+        file.readline()
+    offset = file.tell()
+    while end is None or offset < end:
+        line = file.readline()
+        if not line.endswith(b"\n"):
+            return
+        offset += len(line)
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if not isinstance(record, dict) or \
+                not isinstance(record.get("key"), str):
+            raise ValueError(f"expected a record at {line[:40]!r}")
+        yield record["key"], record.get("value"), offset
+
+
+CODECS = {codec.name: codec for codec
+          in (JSONCodec(), BinaryCodec(), IndexedCodec(), NDJSONCodec())}
+
+
+def detect(data):
+    """Returns the codec that encoded data"""
+    if data.startswith(MAGIC):
+        return CODECS["binary"]
+    if data.startswith(INDEXED_MAGIC):
+        return CODECS["indexed"]
+    # an NDJSON file with no records is empty
+    if not data or data.startswith(b'{"key":'):
+        return CODECS["ndjson"]
+    return CODECS["json"]
+
+
+COMPRESSIONS = ("gzip", "lzma", "zlib")
+# raised when reading a damaged compressed file
+ERRORS = (OSError, EOFError, ValueError, lzma.LZMAError, zlib.error)
+
+
+def compress(data, compression, level=None):
+    """
+    Returns data compressed with gzip, lzma or zlib, at the given level
+    or at the default level of the compression if None.
+    """
+    if compression == "gzip":
+        return gzip.compress(data, 9 if level is None else level, mtime=0)
+    if compression == "lzma":
+        return lzma.compress(data, preset=level)
+    if compression == "zlib":
+        return zlib.compress(data, -1 if level is None else level)
+    raise ValueError("compression must be one of " + ", ".join(COMPRESSIONS))
+
+
+def compression_of(path):
+    """Returns the compression of the file at path, or None"""
+    with open(path, "rb") as file:
+        head = file.read(6)
+    if head.startswith(b"\x1f\x8b"):
+        return "gzip"
+    if head.startswith(b"\xfd7zXZ\x00"):
+        return "lzma"
+    if len(head) > 1 and head[0] == 0x78 and (head[0] << 8 | head[1]) % 31 == 0:
+        return "zlib"
+    return None
+
+
+def open_file(path):
+    """
+    Opens the file at path for reading bytes, decompressing it
+    on the fly if it is compressed.
+    """
+    compression = compression_of(path)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "lzma":
+        return lzma.open(path, "rb")
+    if compression == "zlib":
+        with open(path, "rb") as file:
+            return io.BytesIO(zlib.decompress(file.read()))
+    return open(path, "rb")
+
+
+def _varint(out, number):
+    """Appends an unsigned varint"""
+    while number > 0x7f:
+        out.append(number & 0x7f | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _string(out, text):
+    """Appends a length prefixed UTF-8 string"""
+    raw = text.encode("utf-8")
+    _varint(out, len(raw))
+    out += raw
+
+
+def _value(out, value):
+    """Appends a tagged value"""
+    if value is None:
+        out.append(NONE)
+    elif value is True or value is False:
+        out.append(TRUE if value else FALSE)
+    elif isinstance(value, int):
+        out.append(INT)
+        _varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        out.append(FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        if len(value) == 36 and value[8] == value[13] == value[18] == \
+                value[23] == "-":
+            digits = value.replace("-", "")
+            try:
+                raw = bytes.fromhex(digits)
+            except ValueError:
+                raw = None
+            # only lowercase UUIDs read back as the same string
+            if raw is not None and len(raw) == 16 and raw.hex() == digits:
+                out.append(UUID)
+                out += raw
+                return
+        out.append(STR)
+        _string(out, value)
+    elif isinstance(value, datetime) and value.tzinfo is None:
+        out.append(DATETIME)
+        out += _INT64.pack((value - EPOCH) // MICROSECOND)
+    elif isinstance(value, (list, tuple)):
+        out.append(LIST)
+        _varint(out, len(value))
+        for item in value:
+            _value(out, item)
+    elif isinstance(value, dict):
+        out.append(DICT)
+        _varint(out, len(value))
+        for key, item in value.items():
+            _string(out, str(key))
+            _value(out, item)
+    elif isinstance(value, datetime):
+        _value(out, value.isoformat())
+    else:
+        raise TypeError(f"cannot encode {type(value).__name__} values")
+
+
+class _Reader:
+    """Reads varints, strings and tagged values from bytes"""
+
+    def __init__(self, data, pos=0):
+        """Starts reading data at pos"""
+        self.data = data
+        self.pos = pos
+
+    def varint(self):
+        """Reads an unsigned varint"""
+        data = self.data
+        pos = self.pos
+        number = data[pos]
+        pos += 1
+        if number > 0x7f:
+            number &= 0x7f
+            shift = 7
+            while True:
+                byte = data[pos]
+                pos += 1
+                number |= (byte & 0x7f) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+        self.pos = pos
+        return number
+
+    def string(self):
+        """Reads a length prefixed UTF-8 string"""
+        size = self.varint()
+        start = self.pos
+        self.pos = start + size
+        if self.pos > len(self.data):
+            raise ValueError("truncated string")
+        return self.data[start:self.pos].decode("utf-8")
+
+    def value(self):
+        """Reads a tagged value"""
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == UUID:
+            start = self.pos
+            self.pos += 16
+            digits = self.data[start:self.pos].hex()
+            if len(digits) != 32:
+                raise ValueError("truncated UUID")
+            return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-" \
+                f"{digits[16:20]}-{digits[20:]}"
+        if tag == STR:
+            return self.string()
+        if tag == DATETIME:
+            start = self.pos
+            self.pos += 8
+            return EPOCH + MICROSECOND * _INT64.unpack_from(self.data, start)[0]
+        if tag == INT:
+            number = self.varint()
+            return number >> 1 if not number & 1 else -(number >> 1) - 1
+        if tag == FLOAT:
+            start = self.pos
+            self.pos += 8
+            return _DOUBLE.unpack_from(self.data, start)[0]
+        if tag == NONE:
+            return None
+        if tag == TRUE:
+            return True
+        if tag == FALSE:
+            return False
+        if tag == LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == DICT:
+            items = {}
+            for _ in range(self.varint()):
+                key = self.string()
+                items[key] = self.value()
+            return items
+        raise ValueError(f"unknown value tag {tag}")
+
+
+def convert(source, destination, codec_name):
+    """
+    Rewrites the storage file source into destination with the codec
+    named codec_name, whatever the codec of source. Returns the number
+    of objects converted.
+    """
+    with open_file(source) as file:
+        data = file.read()
+    objects = {key: BaseModel.registry[key.split(".", 1)[0]].from_dict(value)
+               for key, value in detect(data).decode(data).items()}
+    with open(destination, "wb") as file:
+        file.write(CODECS[codec_name].encode(objects))
+    return len(objects)
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+Module for storing data in a SQLite database
+"""
+import json
+import os
+import sqlite3
+from models.engine.file_storage import FileStorage
+from models.base_model import BaseModel
+
+
+class DBStorage(FileStorage):
+    """
+    DBStorage class persisting objects in a SQLite database
+
+    Objects are kept in memory like in FileStorage. Each class of
+    BaseModel.registry has its own table, created when the database is
+    opened or, for a class defined later, on its first save. A table
+    holds the id, the timestamps, the foreign keys as indexed columns
+    and the whole object as JSON. A save upserts or deletes only the rows
+    of objects changed since the last save. The journal and the sharded
+    layout of FileStorage do not apply.
+    """
+    _db_path = os.getenv("HBNB_SQLITE_PATH", "hbnb.db")
+    _journaling = False
+    _sharded = False
+    _foreign_keys = {
+        "City": ("state_id",),
+        "Place": ("city_id", "user_id"),
+        "Review": ("place_id", "user_id"),
+    }
+
+    def __init__(self):
+        """
+        Opens the database and creates the missing tables and indexes.
+        """
+        self.__conn = sqlite3.connect(DBStorage._db_path,
+                                      check_same_thread=False)
+        self.__tables = set()
+        with self.__conn:
+            for table in list(BaseModel.registry):
+                self._create_table(table)
+
+    def _create_table(self, table):
+        """
+        Creates the table of a class and the indexes of its foreign keys
+        unless they exist.
+        """
+        if table in self.__tables:
+            return
+        columns = "".join(f", {column} TEXT" for column
+                          in DBStorage._foreign_keys.get(table, ()))
+        self.__conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "id TEXT PRIMARY KEY, created_at TEXT, updated_at TEXT"
+            f"{columns}, data TEXT NOT NULL)")
+        for column in DBStorage._foreign_keys.get(table, ()):
+            self.__conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} "
+                f"ON {table} ({column})")
+        self.__tables.add(table)
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.__conn.close()
+
+    def flush(self):
+        """
+        Upserts the rows of changed objects and deletes the rows
+        of removed ones, in a single transaction. The changes stay
+        pending if the transaction fails.
+        """
+        with self._lock():
+            if self._defer_flush():
+                return
+            keys = self._dirty_keys()
+            with self.__conn:
+                for key in keys:
+                    table, obj_id = key.split(".", 1)
+                    fragment = self._stored_fragment(key)
+                    self._create_table(table)
+                    if fragment is None:
+                        self.__conn.execute(
+                            f"DELETE FROM {table} WHERE id = ?", (obj_id,))
+                    else:
+                        self._upsert(table, fragment)
+            self._saved(keys)
+            self._evict()
+
+    def _upsert(self, table, fragment):
+        """
+        Inserts or updates the row of one object from its JSON.
+        """
+        obj_dict = json.loads(fragment)
+        columns = ("id", "created_at", "updated_at") + \
+            DBStorage._foreign_keys.get(table, ())
+        values = [obj_dict.get(column) for column in columns]
+        values.append(fragment)
+        columns += ("data",)
+        updates = ", ".join(f"{column} = excluded.{column}"
+                            for column in columns[1:])
+        self.__conn.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}", values)
+
+    def compact(self):
+        """
+        Persists pending changes and reclaims unused database space.
+        """
+        self.flush()
+        self.__conn.execute("VACUUM")
+
+    def reload(self):
+        """
+        Loads every row of every table into memory.
+        """
+        batch = {}
+        tables = {name for (name,) in self.__conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table, cls in list(BaseModel.registry.items()):
+            if table not in tables:
+                continue
+            for (data,) in self.__conn.execute(f"SELECT data FROM {table}"):
+                value = json.loads(data)
+                batch[f"{table}.{value['id']}"] = cls.from_dict(value)
+        with self._lock():
+            self._insert_many(batch)
+        self._clean(batch)
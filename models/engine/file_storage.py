@@ -2,8 +2,16 @@
 """
 Module for serializing and deserializing data
 """
+import atexit
+import contextlib
+import glob
 import json
+import mmap
+import multiprocessing
+import operator
 import os
+import sys
+import threading
 from models.base_model import BaseModel
 from models.user import User
 from models.amenity import Amenity
@@ -11,14 +19,143 @@ from models.place import Place
 from models.review import Review
 from models.state import State
 from models.city import City
+from models.engine import codec
+from models.engine.cache import DiskRecords, DiskStore
+from models.engine.indexes import GridIndex, HashIndex, RangeIndex, TextIndex
+from models.engine.indexes import distance_km
+
+
+_DURABILITY = ("none", "file", "dir")
+
+
+def _write_atomic(path, text, durability="none"):
+    """
+    Replaces the file at path with text, a str or bytes, through a
+    temporary file, so a
+    crash leaves either the old or the new content. With durability
+    "file" the data is synced to disk before the rename, with "dir" the
+    directory holding the rename is synced as well.
+    """
+    if durability not in _DURABILITY:
+        raise ValueError("durability must be one of " + ", ".join(_DURABILITY))
+    tmp_path = path + ".tmp"
+    if isinstance(text, bytes):
+        file = open(tmp_path, "wb")
+    else:
+        file = open(tmp_path, "w", encoding="utf-8")
+    with file:
+        file.write(text)
+        if durability != "none":
+            file.flush()
+            os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    if durability == "dir" and os.name == "posix":
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+_MISSING = object()
+
+
+def _line_ranges(path, count):
+    """
+    Splits the file at path into count byte ranges of about the same
+    size. Every line belongs to the range holding its first byte.
+    """
+    size = os.path.getsize(path)
+    bounds = [size * number // count for number in range(count + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _complete_length(file):
+    """
+    Returns the length of the file opened in binary mode up to the end
+    of its last complete line, leaving out an unterminated last line.
+    """
+    end = file.seek(0, os.SEEK_END)
+    while end:
+        file.seek(max(end - (1 << 12), 0))
+        chunk = file.read(end - file.tell())
+        newline = chunk.rfind(b"\n")
+        if newline >= 0:
+            return end - (len(chunk) - newline - 1)
+        end -= len(chunk)
+    return 0
+
+
+def _build_range(path, start, end, name):
+    """
+    Builds the objects stored on the lines of path, written by the
+    codec called name, starting between the byte offsets start and
+    end. Runs in a worker process.
+    """
+    with open(path, "rb") as file:
+        return FileStorage()._build(
+            codec.CODECS[name].items(file, start, end), {})
+
+
+_OPERATORS = {
+    "eq": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
 
 
 class FileStorage:
     """
     FileStorage class for storing, serializing and deserializing data
+
+    Objects are kept in memory keyed by <class name>.id and indexed by
+    class and by the attributes their class declares. Saves only encode
+    the objects changed since the last one. The storage modes (journal,
+    shards, codecs, lazy loading, cache, write-behind, transactions)
+    are set by the class attributes below and the HBNB_STORAGE_*
+    environment variables described in README.md.
     """
     _file_path = "file.json"
+    _journal_path = "file.json.journal"
+    _journaling = os.getenv("HBNB_STORAGE_JOURNAL") == "1"
+    _journal_limit = 10000
+    _shard_path = "file.{}.json"
+    _sharded = os.getenv("HBNB_STORAGE_SHARDED") == "1"
+    _streaming = os.getenv("HBNB_STORAGE_STREAM") == "1"
+    _flush_interval = float(os.getenv("HBNB_STORAGE_FLUSH_INTERVAL", "0"))
+    _flush_after = int(os.getenv("HBNB_STORAGE_FLUSH_AFTER", "1000"))
+    _durability = os.getenv("HBNB_STORAGE_DURABILITY", "none")
+    _workers = int(os.getenv("HBNB_STORAGE_WORKERS", "0"))
+    _parallel_min_size = 1 << 20
+    _lazy = os.getenv("HBNB_STORAGE_LAZY") == "1"
+    _codec = os.getenv("HBNB_STORAGE_CODEC", "json")
+    _compression = os.getenv("HBNB_STORAGE_COMPRESSION") or None
+    _compression_level = int(os.getenv("HBNB_STORAGE_COMPRESSION_LEVEL", "-1"))
+    _cache_size = int(os.getenv("HBNB_STORAGE_CACHE_SIZE", "0"))
+    _cache_path = "file.json.cache"
     __objects = {}
+    __dirty = set()
+    __fragments = {}
+    __journal_size = 0
+    __loaded = set()
+    __by_class = {}
+    __attr_indexes = {}
+    __indexed = None
+    __lock = threading.RLock()
+    __flush_needed = threading.Condition(__lock)
+    __pending = 0
+    __flusher = None
+    __undo = None
+    __savepoints = []
+    __save_requested = False
+    __bulk = None
+    __raw = {}
+    __offset = None
+    __recent = {}
+    __disk = None
+    __cache_stats = dict.fromkeys(("hits", "misses", "evictions", "writes"), 0)
 
     def add(self, obj):
         """
@@ -27,35 +164,1213 @@ class FileStorage:
         """
         class_name = obj.__class__.__name__
         key = f"{class_name}.{obj.id}"
-        FileStorage.__objects[key] = obj
+        with FileStorage.__lock:
+            if FileStorage.__bulk is not None:
+                FileStorage.__bulk[key] = obj
+                return
+            self._materialize_key(key)
+            previous = FileStorage.__objects.get(key)
+            if previous is obj:
+                pass
+            elif FileStorage.__undo is not None:
+                FileStorage.__undo.append(("add", key, previous))
+            if previous is not None and previous is not obj:
+                self._remove(key)
+            FileStorage.__objects[key] = obj
+            self._class_index().setdefault(class_name, {})[key] = obj
+            for index in self._indexes(obj.__class__).values():
+                index.update(obj)
+            FileStorage.__dirty.add(key)
+            self._touch(key)
+            self._evict()
+
+    def add_many(self, objects):
+        """
+        Adds every object of an iterable, and the instances created while
+        it is consumed, then indexes them in one pass and saves once.
+        If the iterable raises, none of its objects are added.
+        Returns the number of objects added.
+        """
+        with FileStorage.__lock:
+            if FileStorage.__bulk is not None:
+                count = 0
+                for obj in objects:
+                    self.add(obj)
+                    count += 1
+                return count
+            FileStorage.__bulk = {}
+            try:
+                for obj in objects:
+                    self.add(obj)
+            finally:
+                batch = FileStorage.__bulk
+                FileStorage.__bulk = None
+            self._insert_many(batch)
+            self.save_to_file()
+            self._evict()
+            return len(batch)
+
+    def _insert_many(self, batch):
+        """
+        Stores the objects of batch, a dictionary keyed like __objects,
+        updating each index once per class rather than once per object.
+        """
+        by_class = self._class_index()
+        added = {}
+        for key, obj in batch.items():
+            self._materialize_key(key)
+            previous = FileStorage.__objects.get(key)
+            if previous is obj:
+                continue
+            if FileStorage.__undo is not None:
+                FileStorage.__undo.append(("add", key, previous))
+            if previous is not None:
+                self._remove(key)
+            FileStorage.__objects[key] = obj
+            by_class.setdefault(key.split(".", 1)[0], {})[key] = obj
+            added.setdefault(obj.__class__, []).append(obj)
+            FileStorage.__dirty.add(key)
+            self._touch(key)
+        for cls, objs in added.items():
+            for index in self._indexes(cls).values():
+                # resorting everything beats inserting a large batch
+                if hasattr(index, "rebuild") and len(objs) > len(index):
+                    index.rebuild(by_class[cls.__name__].values())
+                else:
+                    for obj in objs:
+                        index.update(obj)
+
+    def delete(self, obj):
+        """
+        Removes an object from the __objects dictionary.
+        The removal is persisted by the next save.
+        """
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        with FileStorage.__lock:
+            # an evicted or unread object is built so it can be undone
+            self._materialize_key(key)
+            removed = self._remove(key)
+            if removed is not None:
+                FileStorage.__dirty.add(key)
+                if FileStorage.__undo is not None:
+                    FileStorage.__undo.append(("delete", key, removed))
+
+    def _remove(self, key):
+        """
+        Drops key from __objects and from the indexes,
+        returning the object it held if any.
+        """
+        obj = FileStorage.__objects.pop(key, None)
+        FileStorage.__recent.pop(key, None)
+        raw = FileStorage.__raw.get(key.split(".", 1)[0])
+        if raw and key in raw:
+            del raw[key]
+            FileStorage.__fragments.pop(key, None)
+        if obj is not None:
+            class_name = key.split(".", 1)[0]
+            self._class_index().get(class_name, {}).pop(key, None)
+            for index in self._indexes(obj.__class__).values():
+                index.remove(obj.id)
+            FileStorage.__fragments.pop(key, None)
+        return obj
+
+    def _class_index(self):
+        """
+        Returns the objects grouped by class name, rebuilding the
+        groups if __objects was replaced since they were built.
+        """
+        if FileStorage.__indexed is not FileStorage.__objects:
+            FileStorage.__by_class = {}
+            FileStorage.__attr_indexes = {}
+            FileStorage.__raw = {}
+            FileStorage.__recent = dict.fromkeys(
+                FileStorage.__objects if FileStorage._cache_size > 0 else ())
+            FileStorage.__indexed = FileStorage.__objects
+            for key, obj in FileStorage.__objects.items():
+                FileStorage.__by_class.setdefault(
+                    key.split(".", 1)[0], {})[key] = obj
+                for index in self._indexes(obj.__class__).values():
+                    index.update(obj)
+        return FileStorage.__by_class
+
+    def _indexes(self, cls):
+        """
+        Returns the attribute indexes declared by cls, keyed by
+        ("hash" or "range", attribute) or ("spatial" or "text", attributes).
+        """
+        self._class_index()
+        indexes = FileStorage.__attr_indexes.get(cls.__name__)
+        if indexes is None:
+            indexes = {}
+            for attribute in getattr(cls, "_indexes", ()):
+                indexes["hash", attribute] = HashIndex(attribute)
+            for attribute in getattr(cls, "_range_indexes", ()):
+                indexes["range", attribute] = RangeIndex(attribute)
+            spatial = getattr(cls, "_spatial_index", None)
+            if spatial:
+                indexes["spatial", spatial] = GridIndex(*spatial)
+            text = getattr(cls, "_text_index", None)
+            if text:
+                indexes["text", text] = TextIndex(*text)
+            FileStorage.__attr_indexes[cls.__name__] = indexes
+        return indexes
+
+    def lookup(self, cls, attribute, value):
+        """
+        Returns the ids of the instances of cls whose attribute equals
+        value. Attributes listed in cls._indexes are answered from their
+        hash index, others by scanning the instances of cls.
+        """
+        index = self._indexes(cls).get(("hash", attribute))
+        self._load_class(cls.__name__)
+        if index is not None:
+            ids = set(index.lookup(value))
+            self._evict()
+            return ids
+        return {obj.id for obj in self.all(cls).values()
+                if getattr(obj, attribute, None) == value}
+
+    def range(self, cls, attribute, low=None, high=None):
+        """
+        Returns the instances of cls whose attribute is between low and
+        high, both included, ordered by attribute. None leaves a bound
+        open. Attributes listed in cls._range_indexes are answered from
+        their range index, others by scanning the instances of cls.
+        """
+        index = self._indexes(cls).get(("range", attribute))
+        self._load_class(cls.__name__)
+        group = self._class_index().get(cls.__name__, {})
+        if index is None:
+            matches = [obj for obj in group.values()
+                       if isinstance(getattr(obj, attribute, None), (int, float))
+                       and (low is None or getattr(obj, attribute) >= low)
+                       and (high is None or getattr(obj, attribute) <= high)]
+            matches.sort(key=lambda obj: getattr(obj, attribute))
+        else:
+            matches = [group[f"{cls.__name__}.{obj_id}"]
+                       for obj_id in index.range(low, high)]
+        self._evict()
+        return matches
+
+    def _spatial_index(self, cls):
+        """
+        Returns the grid index of cls, or None.
+        """
+        spatial = getattr(cls, "_spatial_index", None)
+        return self._indexes(cls).get(("spatial", spatial))
+
+    def near(self, lat, lon, k=20, cls=Place):
+        """
+        Returns the k instances of cls nearest to a point, nearest first.
+        """
+        index = self._spatial_index(cls)
+        self._load_class(cls.__name__)
+        group = self._class_index().get(cls.__name__, {})
+        if index is None:
+            located = [(distance_km(lat, lon, obj.latitude, obj.longitude), key)
+                       for key, obj in group.items()]
+            nearest = [group[key] for _, key in sorted(located)[:k]]
+        else:
+            nearest = [group[f"{cls.__name__}.{obj_id}"]
+                       for _, obj_id in index.near(lat, lon, k)]
+        self._evict()
+        return nearest
+
+    def within(self, min_lat, min_lon, max_lat, max_lon, cls=Place):
+        """
+        Returns the instances of cls inside a bounding box. A box with
+        min_lon > max_lon crosses the antimeridian.
+        """
+        index = self._spatial_index(cls)
+        self._load_class(cls.__name__)
+        group = self._class_index().get(cls.__name__, {})
+        if index is None:
+            lon_inside = (lambda lon: min_lon <= lon <= max_lon) \
+                if min_lon <= max_lon else \
+                (lambda lon: lon >= min_lon or lon <= max_lon)
+            inside = [obj for obj in group.values()
+                      if min_lat <= obj.latitude <= max_lat
+                      and lon_inside(obj.longitude)]
+        else:
+            inside = [group[f"{cls.__name__}.{obj_id}"] for obj_id
+                      in index.within(min_lat, min_lon, max_lat, max_lon)]
+        self._evict()
+        return inside
+
+    def search(self, query, cls=None, mode="and"):
+        """
+        Returns the instances whose indexed text uses all the words of
+        query (mode "and") or any of them (mode "or"), most occurrences
+        first. cls (a class or a class name) limits the search to one
+        class, otherwise every class with a _text_index is searched.
+        """
+        if cls is None:
+            self.get_all()
+            class_names = list(self._class_index())
+        else:
+            class_names = [cls if isinstance(cls, str) else cls.__name__]
+            self._load_class(class_names[0])
+        self._class_index()
+        results = []
+        for class_name in class_names:
+            indexes = FileStorage.__attr_indexes.get(class_name, {})
+            for (kind, _), index in indexes.items():
+                if kind == "text":
+                    results.extend((score, f"{class_name}.{obj_id}")
+                                   for score, obj_id in index.search(query, mode))
+        results.sort(key=lambda pair: (-pair[0], pair[1]))
+        found = [FileStorage.__objects[key] for _, key in results]
+        self._evict()
+        return found
+
+    def find(self, cls, **criteria):
+        """
+        Returns the instances of cls matching every criterion. A criterion
+        is attribute=value for equality, or attribute__gt, __gte, __lt or
+        __lte=value for a comparison. The most selective index available
+        gives the first candidates, other cheap indexes narrow them down
+        and the remaining criteria are checked on what is left.
+        """
+        return self._find(cls, criteria)[0]
+
+    def explain(self, cls, **criteria):
+        """
+        Runs find(cls, **criteria) and returns the steps it took,
+        one description per step.
+        """
+        return self._find(cls, criteria)[1]
+
+    def _find(self, cls, criteria):
+        """
+        Returns the matching instances of cls and the steps taken.
+        """
+        predicates = []
+        bounds = {}
+        for name, value in criteria.items():
+            attribute, _, op = name.partition("__")
+            if (op or "eq") not in _OPERATORS:
+                raise ValueError(f"unknown operator in {name!r}")
+            predicates.append((attribute, op or "eq", value))
+            low, high = bounds.get(attribute, (None, None))
+            if op in ("", "gt", "gte"):
+                low = value if low is None else max(low, value)
+            if op in ("", "lt", "lte"):
+                high = value if high is None else min(high, value)
+            bounds[attribute] = (low, high)
+
+        indexes = self._indexes(cls)
+        self._load_class(cls.__name__)
+        group = self._class_index().get(cls.__name__, {})
+        sources = []
+        for attribute, op, value in predicates:
+            index = indexes.get(("hash", attribute))
+            if op == "eq" and index is not None:
+                ids = index.lookup(value)
+                sources.append((len(ids), f"hash index {attribute} = {value!r}",
+                                lambda ids=ids: ids))
+        for attribute, (low, high) in bounds.items():
+            index = indexes.get(("range", attribute))
+            numbers = all(isinstance(bound, (int, float, type(None)))
+                          for bound in (low, high))
+            if index is not None and numbers and \
+                    ("hash", attribute) not in indexes:
+                sources.append((index.count(low, high),
+                                f"range index {attribute} in [{low}, {high}]",
+                                lambda index=index, low=low, high=high:
+                                set(index.range(low, high))))
+        sources.sort(key=lambda source: source[0])
+
+        if sources:
+            size, description, fetch = sources[0]
+            candidates = set(fetch())
+            steps = [f"{description} -> {size} ids"]
+            for size, description, fetch in sources[1:]:
+                if not candidates:
+                    break
+                if size > len(candidates) and description.startswith("range"):
+                    continue
+                candidates &= fetch()
+                steps.append(f"intersect {description} -> {len(candidates)} ids")
+            objects = [group[f"{cls.__name__}.{obj_id}"] for obj_id in candidates]
+        else:
+            objects = list(group.values())
+            steps = [f"scan {cls.__name__} -> {len(objects)} objects"]
+
+        def matches(obj):
+            for attribute, op, value in predicates:
+                try:
+                    if not _OPERATORS[op](getattr(obj, attribute, None), value):
+                        return False
+                except TypeError:
+                    return False
+            return True
+
+        found = [obj for obj in objects if matches(obj)]
+        steps.append(f"check {len(predicates)} criteria -> {len(found)} objects")
+        self._evict()
+        return found, steps
+
+    def get(self, cls, obj_id):
+        """
+        Returns the instance of cls (a class or a class name)
+        with the given id, or None.
+        """
+        class_name = cls if isinstance(cls, str) else cls.__name__
+        if type(self)._sharded:
+            self._load_shard(class_name)
+        key = f"{class_name}.{obj_id}"
+        if FileStorage._cache_size <= 0:
+            self._materialize_key(key)
+            return FileStorage.__objects.get(key)
+        with FileStorage.__lock:
+            self._class_index()
+            hit = key in FileStorage.__objects
+            self._materialize_key(key)
+            obj = FileStorage.__objects.get(key)
+            if obj is not None:
+                FileStorage.__cache_stats["hits" if hit else "misses"] += 1
+                self._touch(key)
+                self._evict()
+            return obj
+
+    def related(self, cls, attribute, value):
+        """
+        Returns the instances of cls whose attribute equals value, such as
+        the cities of a state. The list is cached by the hash index of
+        attribute until an instance joins or leaves it.
+        """
+        index = self._indexes(cls).get(("hash", attribute))
+        if index is None:
+            return [obj for obj in self.all(cls).values()
+                    if getattr(obj, attribute, None) == value]
+        self._load_class(cls.__name__)
+        objects = index.cache.get(value)
+        if objects is None:
+            group = self._class_index().get(cls.__name__, {})
+            objects = [group[f"{cls.__name__}.{obj_id}"]
+                       for obj_id in index.lookup(value)]
+            index.cache[value] = objects
+        self._evict()
+        return list(objects)
+
+    def attribute_changing(self, obj, name):
+        """
+        Records the current value of an attribute of a stored object
+        in the undo log of the open transaction, if any.
+        """
+        if FileStorage.__undo is None:
+            return
+        obj_id = obj.__dict__.get("id")
+        key = f"{obj.__class__.__name__}.{obj_id}"
+        with FileStorage.__lock:
+            if FileStorage.__objects.get(key) is obj:
+                FileStorage.__undo.append(
+                    ("set", key, (obj, name, obj.__dict__.get(name, _MISSING))))
+
+    def attribute_changed(self, obj, name):
+        """
+        Flags a stored object as changed so the next save writes it,
+        and re-indexes it if name is an indexed attribute.
+        Objects that are not (yet) stored are ignored.
+        """
+        obj_id = obj.__dict__.get("id")
+        if obj_id is None:
+            return
+        key = f"{obj.__class__.__name__}.{obj_id}"
+        with FileStorage.__lock:
+            if FileStorage.__objects.get(key) is obj:
+                FileStorage.__dirty.add(key)
+                for index in self._indexes(obj.__class__).values():
+                    if name in index.attributes:
+                        index.update(obj)
+
+    def _lock(self):
+        """
+        Returns the lock serializing changes and flushes.
+        """
+        return FileStorage.__lock
+
+    def _dirty_keys(self):
+        """
+        Returns a copy of the keys changed since the last save.
+        """
+        return set(FileStorage.__dirty)
+
+    def _saved(self, keys):
+        """
+        Forgets the changes of keys once they are persisted by a caller
+        that does not refresh their cached JSON.
+        """
+        FileStorage.__dirty.difference_update(keys)
+        for key in keys:
+            FileStorage.__fragments.pop(key, None)
+
+    def _clean(self, keys):
+        """
+        Flags the objects of keys as matching their stored copy.
+        """
+        FileStorage.__dirty.difference_update(keys)
+
+    def _fragment(self, key, obj):
+        """
+        Returns the cached JSON of an object, encoding it again
+        only if it changed since it was cached.
+        """
+        fragment = FileStorage.__fragments.get(key)
+        if fragment is None or key in FileStorage.__dirty:
+            fragment = json.dumps(obj.to_dict())
+            FileStorage.__fragments[key] = fragment
+        return fragment
+
+    def _stored_fragment(self, key):
+        """
+        Returns the JSON of the object of key, whether it is in memory
+        or only held as a raw record, or None if there is no such object.
+        """
+        obj = FileStorage.__objects.get(key)
+        if obj is not None:
+            return self._fragment(key, obj)
+        raw = FileStorage.__raw.get(key.split(".", 1)[0])
+        if raw and key in raw:
+            return raw[key]
+        return None
+
+    def _touch(self, key):
+        """
+        Marks the object of key as the most recently used one.
+        """
+        if FileStorage._cache_size > 0:
+            FileStorage.__recent.pop(key, None)
+            FileStorage.__recent[key] = None
+
+    def _evict(self):
+        """
+        Evicts the least recently used objects until no more than
+        _cache_size are in memory.
+        """
+        size = FileStorage._cache_size
+        if size <= 0 or type(self)._sharded or \
+                FileStorage.__undo is not None or \
+                FileStorage.__bulk is not None:
+            return
+        with FileStorage.__lock:
+            self._class_index()
+            recent = FileStorage.__recent
+            while len(FileStorage.__objects) > size and recent:
+                key = next(iter(recent))
+                del recent[key]
+                obj = FileStorage.__objects.get(key)
+                if obj is not None:
+                    self._spill(key, obj)
+
+    def _spill(self, key, obj):
+        """
+        Replaces the instance of key in memory with its JSON record,
+        kept in the dbm file at _cache_path.
+        """
+        class_name = key.split(".", 1)[0]
+        fragment = self._fragment(key, obj)
+        records = FileStorage.__raw.get(class_name)
+        if not isinstance(records, DiskRecords):
+            if FileStorage.__disk is None:
+                FileStorage.__disk = DiskStore(FileStorage._cache_path)
+            records = DiskRecords(FileStorage.__disk, records)
+            FileStorage.__raw[class_name] = records
+        if not records.restore(key, fragment):
+            records[key] = fragment
+            FileStorage.__cache_stats["writes"] += 1
+        del FileStorage.__objects[key]
+        FileStorage.__by_class.get(class_name, {}).pop(key, None)
+        for index in self._indexes(obj.__class__).values():
+            index.remove(obj.id)
+        FileStorage.__fragments.pop(key, None)
+        FileStorage.__cache_stats["evictions"] += 1
+
+    def cache_stats(self):
+        """
+        Returns the number of get() calls answered from memory (hits) or
+        by building the object again (misses), of evicted objects and of
+        records written to the disk store, with the number of objects
+        in memory (size) and the bound of the cache (capacity).
+        """
+        with FileStorage.__lock:
+            stats = dict(FileStorage.__cache_stats)
+            stats["size"] = len(FileStorage.__objects)
+            stats["capacity"] = FileStorage._cache_size
+            return stats
+
+    def new(self, obj):
+        """
+        Alias of add.
+        """
+        self.add(obj)
 
     def get_all(self):
         """
         Returns the __objects dictionary, providing access to all stored objects.
         """
+        if type(self)._sharded:
+            for class_name in self._shard_names():
+                self._load_shard(class_name)
+        self._class_index()
+        for class_name in list(FileStorage.__raw):
+            self._load_class(class_name)
         return FileStorage.__objects
 
+    def all(self, cls=None):
+        """
+        Returns all stored objects, or only the instances of cls
+        (a class or a class name) keyed by <class name>.id.
+        """
+        with FileStorage.__lock:
+            if cls is None:
+                objects = self.get_all()
+                if FileStorage._cache_size <= 0:
+                    return objects
+            else:
+                class_name = cls if isinstance(cls, str) else cls.__name__
+                self._load_class(class_name)
+                objects = self._class_index().get(class_name, {})
+            objects = dict(objects)
+            self._evict()
+            return objects
+
+    def count(self, cls=None):
+        """
+        Returns the number of stored objects, or of instances of cls
+        (a class or a class name).
+        """
+        if cls is None:
+            if type(self)._sharded:
+                return len(self.get_all())
+            self._class_index()
+            return len(FileStorage.__objects) + \
+                sum(map(len, FileStorage.__raw.values()))
+        class_name = cls if isinstance(cls, str) else cls.__name__
+        if type(self)._sharded:
+            self._load_shard(class_name)
+        return len(self._class_index().get(class_name, {})) + \
+            len(FileStorage.__raw.get(class_name, ()))
+
+    def save(self):
+        """
+        Alias of save_to_file, used by the console.
+        """
+        self.save_to_file()
+
     def save_to_file(self):
         """
-        Serializes the __objects dictionary into JSON format
-        and writes it to the file specified by _file_path.
+        Persists the objects changed since the last save, right away or,
+        in write-behind mode, on the next flush of the background thread.
+        Inside a transaction the save is deferred to its commit.
         """
-        object_dict = {key: obj.to_dict() for key, obj in FileStorage.__objects.items()}
-        with open(FileStorage._file_path, "w", encoding="utf-8") as file:
-            json.dump(object_dict, file)
+        if FileStorage.__undo is not None:
+            FileStorage.__save_requested = True
+        elif FileStorage._flush_interval > 0:
+            self._schedule_flush()
+        else:
+            self.flush()
 
-    def reload(self):
+    def flush(self):
+        """
+        Persists the objects changed since the last save, either by
+        rewriting their shards, by appending them to the journal or
+        by rewriting _file_path. Inside a transaction nothing is
+        written until it is committed or rolled back.
+        """
+        with FileStorage.__lock:
+            if self._defer_flush():
+                return
+            if type(self)._sharded:
+                self._save_shards()
+            elif type(self)._journaling:
+                self._append_journal()
+                if FileStorage.__journal_size >= FileStorage._journal_limit:
+                    self.compact()
+            elif FileStorage._codec == "ndjson" and self._appendable():
+                self._append_records()
+                if FileStorage.__journal_size >= FileStorage._journal_limit:
+                    self.compact()
+            else:
+                self.compact()
+            self._evict()
+
+    def _defer_flush(self):
+        """
+        Tells whether a transaction is open, in which case flushes wait
+        for its commit.
+        """
+        return FileStorage.__undo is not None
+
+    def begin(self):
+        """
+        Opens a transaction, or a nested one inside an open transaction.
+        """
+        with FileStorage.__lock:
+            if FileStorage.__undo is None and FileStorage.__pending:
+                # write the saves queued so far before they could be
+                # mixed with uncommitted changes
+                FileStorage.__pending = 0
+                self.flush()
+            if FileStorage.__undo is None:
+                FileStorage.__undo = []
+                FileStorage.__save_requested = False
+            FileStorage.__savepoints.append(len(FileStorage.__undo))
+
+    def commit(self):
+        """
+        Closes the innermost transaction. Closing the outermost one
+        persists its changes with a single save.
+        """
+        with FileStorage.__lock:
+            if not FileStorage.__savepoints:
+                raise RuntimeError("no transaction in progress")
+            FileStorage.__savepoints.pop()
+            if FileStorage.__savepoints:
+                return
+            FileStorage.__undo = None
+            if FileStorage.__save_requested or FileStorage.__dirty:
+                self.save_to_file()
+
+    def rollback(self):
+        """
+        Undoes the changes made since the innermost transaction
+        began and closes it.
         """
-        Deserializes the JSON file specified by _file_path.
+        with FileStorage.__lock:
+            if not FileStorage.__savepoints:
+                raise RuntimeError("no transaction in progress")
+            savepoint = FileStorage.__savepoints.pop()
+            undo = FileStorage.__undo
+            # the changes made while undoing are not recorded
+            FileStorage.__undo = []
+            try:
+                while len(undo) > savepoint:
+                    self._undo(*undo.pop())
+            finally:
+                FileStorage.__undo = undo if FileStorage.__savepoints else None
+            self._evict()
+
+    def _undo(self, op, key, value):
+        """
+        Reverts one record of the undo log.
+        """
+        if op == "set":
+            obj, name, old = value
+            if old is _MISSING:
+                obj.__dict__.pop(name, None)
+            else:
+                obj.__dict__[name] = old
+            self.attribute_changed(obj, name)
+        elif op == "add":
+            self._remove(key)
+            FileStorage.__dirty.add(key)
+            if value is not None:
+                self.add(value)
+        else:
+            self.add(value)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Runs the body of a with statement in a transaction, committed
+        on success and rolled back if an exception is raised.
+        """
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    def _schedule_flush(self):
         """
-        if os.path.isfile(FileStorage._file_path):
-            with open(FileStorage._file_path, "r", encoding="utf-8") as file:
+        Counts a pending change, starting the flushing thread if needed.
+        """
+        with FileStorage.__lock:
+            FileStorage.__pending += 1
+            if FileStorage.__flusher is None or \
+                    not FileStorage.__flusher.is_alive():
+                if FileStorage.__flusher is None:
+                    atexit.register(self.flush)
+                FileStorage.__flusher = threading.Thread(
+                    target=self._flush_loop, name="FileStorage-flush",
+                    daemon=True)
+                FileStorage.__flusher.start()
+            FileStorage.__flush_needed.notify()
+
+    def _flush_loop(self):
+        """
+        Waits for pending changes and flushes them, at most once
+        per _flush_interval unless _flush_after changes are pending.
+        A failed flush is reported and retried after _flush_interval.
+        """
+        while True:
+            with FileStorage.__lock:
+                FileStorage.__flush_needed.wait_for(
+                    lambda: FileStorage.__pending > 0)
+                FileStorage.__flush_needed.wait_for(
+                    lambda: FileStorage.__pending >= FileStorage._flush_after,
+                    timeout=FileStorage._flush_interval)
+                pending = FileStorage.__pending
+                if not pending:
+                    continue
+                FileStorage.__pending = 0
                 try:
-                    obj_dict = json.load(file)
-                    for key, value in obj_dict.items():
-                        class_name, obj_id = key.split('.')
-                        cls = eval(class_name)
-                        instance = cls(**value)
-                        FileStorage.__objects[key] = instance
-                except Exception:
-                    pass
+                    self.flush()
+                except Exception as error:
+                    FileStorage.__pending += pending
+                    print(f"** flush failed ({error!r}), will retry **",
+                          file=sys.stderr)
+                    FileStorage.__flush_needed.wait(FileStorage._flush_interval)
+
+    def compact(self):
+        """
+        Serializes the __objects dictionary with the codec named by
+        _codec, writes it to the file specified by _file_path and
+        discards the journal it supersedes.
+        """
+        with FileStorage.__lock:
+            self._class_index()
+            if FileStorage._codec == "json":
+                objects = FileStorage.__objects
+                parts = [f"{json.dumps(key)}: {self._fragment(key, obj)}"
+                         for key, obj in objects.items()]
+                for raw in FileStorage.__raw.values():
+                    parts.extend(f"{json.dumps(key)}: {fragment}"
+                                 for key, fragment in raw.items())
+                data = self._document(parts)
+            elif FileStorage._codec in ("indexed", "ndjson"):
+                objects = FileStorage.__objects
+                fragments = [(key, self._fragment(key, obj))
+                             for key, obj in objects.items()]
+                for raw in FileStorage.__raw.values():
+                    fragments.extend(raw.items())
+                data = codec.CODECS[FileStorage._codec].encode_fragments(
+                    fragments)
+            else:
+                if type(self)._sharded:
+                    self.get_all()
+                objects = FileStorage.__objects
+                # the raw records are built for the encoder only, so
+                # that a save neither fills nor churns the cache
+                records = dict(objects)
+                for raw in FileStorage.__raw.values():
+                    records.update(
+                        (key, self._from_record(key, json.loads(fragment)))
+                        for key, fragment in raw.items())
+                data = codec.CODECS[FileStorage._codec].encode(records)
+                for key in FileStorage.__dirty:
+                    FileStorage.__fragments.pop(key, None)
+            if FileStorage._compression:
+                if isinstance(data, str):
+                    data = data.encode("utf-8")
+                level = FileStorage._compression_level
+                data = codec.compress(data, FileStorage._compression,
+                                      None if level < 0 else level)
+            _write_atomic(FileStorage._file_path, data,
+                          FileStorage._durability)
+            FileStorage.__offset = len(data)
+            FileStorage.__dirty.clear()
+            if len(FileStorage.__fragments) > len(objects):
+                FileStorage.__fragments = {
+                    key: fragment for key, fragment
+                    in FileStorage.__fragments.items() if key in objects}
+            if os.path.isfile(FileStorage._journal_path):
+                os.remove(FileStorage._journal_path)
+            FileStorage.__journal_size = 0
+
+    def _document(self, parts):
+        """
+        Returns the JSON object made of the "key": value parts,
+        one part per line.
+        """
+        if not parts:
+            return "{}"
+        return "{\n" + ",\n".join(parts) + "\n}\n"
+
+    def _append_journal(self):
+        """
+        Appends one record per changed object to the journal.
+        """
+        lines = []
+        for key in FileStorage.__dirty:
+            fragment = self._stored_fragment(key)
+            if fragment is None:
+                record = {"op": "delete", "key": key}
+                lines.append(json.dumps(record) + "\n")
+            else:
+                lines.append('{"op": "set", "key": %s, "value": %s}\n'
+                             % (json.dumps(key), fragment))
+        if lines:
+            with open(FileStorage._journal_path, "a", encoding="utf-8") as file:
+                file.writelines(lines)
+                if FileStorage._durability != "none":
+                    file.flush()
+                    os.fsync(file.fileno())
+        FileStorage.__journal_size += len(lines)
+        FileStorage.__dirty.clear()
+
+    def _appendable(self):
+        """
+        Tells whether changes can be appended to _file_path, an
+        uncompressed NDJSON snapshot that no other codec rewrote.
+        """
+        return FileStorage._compression is None and \
+            FileStorage.__offset is not None and \
+            self._snapshot_codec() == "ndjson" and \
+            codec.compression_of(FileStorage._file_path) is None
+
+    def _append_records(self):
+        """
+        Appends one NDJSON record per changed object to _file_path.
+        """
+        ndjson = codec.CODECS["ndjson"]
+        lines = []
+        for key in FileStorage.__dirty:
+            lines.append(ndjson.record(key, self._stored_fragment(key)))
+        if lines:
+            data = "".join(lines).encode("utf-8")
+            with open(FileStorage._file_path, "r+b") as file:
+                # a record torn by a crashed writer would be glued
+                # to this one, drop it
+                end = _complete_length(file)
+                file.seek(end)
+                file.truncate()
+                file.write(data)
+                if FileStorage._durability != "none":
+                    file.flush()
+                    os.fsync(file.fileno())
+                FileStorage.__offset = file.tell()
+        FileStorage.__journal_size += len(lines)
+        FileStorage.__dirty.clear()
+
+    def refresh(self):
+        """
+        Applies the NDJSON records appended to _file_path since the
+        offset this process last read or wrote, such as the changes
+        saved by another process. Any other snapshot is reloaded.
+        Returns the number of records applied.
+        """
+        path = FileStorage._file_path
+        with FileStorage.__lock:
+            offset = FileStorage.__offset
+            if offset is None or self._snapshot_codec() != "ndjson" or \
+                    codec.compression_of(path) is not None or \
+                    os.path.getsize(path) < offset:
+                self.reload()
+                return self.count()
+            keys = []
+            with open(path, "rb") as file:
+                for key, value, offset in codec.read_records(file, offset):
+                    self._apply(key, value)
+                    keys.append(key)
+            FileStorage.__offset = offset
+            FileStorage.__journal_size += len(keys)
+            self._clean(keys)
+            return len(keys)
+
+    def _apply(self, key, value):
+        """
+        Stores the object of a record read back, or removes key if value
+        is None, outside of the transaction in progress if any.
+        """
+        undo = FileStorage.__undo
+        FileStorage.__undo = None
+        try:
+            if value is None:
+                self._remove(key)
+            else:
+                self.add(self._from_record(key, value))
+        finally:
+            FileStorage.__undo = undo
+
+    def _insert_records(self, batch):
+        """
+        Stores the objects of batch, a dictionary keyed like __objects,
+        and removes the keys it maps to None.
+        """
+        for key, obj in batch.items():
+            if obj is None:
+                self._remove(key)
+        self._insert_many({key: obj for key, obj in batch.items()
+                           if obj is not None})
+
+    def _from_record(self, key, value):
+        """
+        Builds the instance stored under key from its attributes.
+        """
+        return BaseModel.registry[key.split(".", 1)[0]].from_dict(value)
+
+    def _build(self, items, batch):
+        """
+        Builds the objects of the (key, attributes) pairs of items into
+        batch, keyed like __objects, with None for a key without
+        attributes, and returns batch.
+        """
+        for key, value in items:
+            batch[key] = None if value is None else \
+                self._from_record(key, value)
+        return batch
+
+    def _parallel(self):
+        """
+        Tells whether reload() should build the objects of _file_path
+        in worker processes.
+        """
+        path = FileStorage._file_path
+        if FileStorage._workers < 2 or not os.path.isfile(path) or \
+                "fork" not in multiprocessing.get_all_start_methods() or \
+                os.path.getsize(path) < FileStorage._parallel_min_size or \
+                codec.compression_of(path) is not None:
+            return False
+        return self._one_per_line(path) or self._snapshot_codec() == "ndjson"
+
+    def _load_class(self, class_name):
+        """
+        Makes sure every stored instance of class_name is in memory,
+        reading its shard or materializing its raw records.
+        """
+        if type(self)._sharded:
+            self._load_shard(class_name)
+        if not FileStorage.__raw:
+            return
+        with FileStorage.__lock:
+            self._class_index()
+            raw = FileStorage.__raw.pop(class_name, None)
+            if raw:
+                self._materialize(raw)
+
+    def _materialize_key(self, key):
+        """
+        Builds the instance of key if it is only held as a raw record.
+        """
+        if not FileStorage.__raw:
+            return
+        class_name = key.split(".", 1)[0]
+        with FileStorage.__lock:
+            self._class_index()
+            raw = FileStorage.__raw.get(class_name)
+            if raw and key in raw:
+                self._materialize({key: raw.pop(key)})
+                if not raw:
+                    del FileStorage.__raw[class_name]
+
+    def _materialize(self, raw):
+        """
+        Builds and stores the instances of raw, a mapping of JSON
+        records keyed like __objects. Their records are kept as cached
+        fragments, so they are saved back as they were read.
+        """
+        raw = dict(raw.items())
+        # objects evicted with unsaved changes stay changed
+        changed = FileStorage.__dirty.intersection(raw)
+        batch = {key: self._from_record(key, json.loads(fragment))
+                 for key, fragment in raw.items()}
+        # not a change of the transaction in progress, if any
+        undo = FileStorage.__undo
+        FileStorage.__undo = None
+        try:
+            self._insert_many(batch)
+        finally:
+            FileStorage.__undo = undo
+        FileStorage.__fragments.update(raw)
+        self._clean([key for key in batch if key not in changed])
+
+    def _read_raw(self, path):
+        """
+        Keeps the record of every object of a snapshot with one object
+        per line as raw JSON, replacing the instances held in memory.
+        """
+        self._class_index()
+        with codec.open_file(path) as file:
+            for key, fragment in codec.CODECS["json"].fragments(file):
+                self._remove(key)
+                FileStorage.__dirty.discard(key)
+                FileStorage.__raw.setdefault(key.split(".", 1)[0], {})[key] = \
+                    fragment
+
+    def _snapshot_codec(self):
+        """
+        Returns the name of the codec that wrote _file_path,
+        or None if there is no readable _file_path.
+        """
+        if not os.path.isfile(FileStorage._file_path):
+            return None
+        try:
+            with codec.open_file(FileStorage._file_path) as file:
+                return codec.detect(file.read(len(codec.INDEXED_MAGIC))).name
+        except codec.ERRORS:
+            return None
+
+    def _map_snapshot(self, path):
+        """
+        Maps an indexed snapshot in memory and keeps its records as the
+        raw records of their classes, replacing the instances held in
+        memory. A compressed snapshot is decompressed in memory instead.
+        """
+        if codec.compression_of(path) is None:
+            with open(path, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            with codec.open_file(path) as file:
+                buffer = file.read()
+        classes = codec.MappedSnapshot(buffer).classes()
+        self._class_index()
+        for key in list(FileStorage.__objects):
+            records = classes.get(key.split(".", 1)[0])
+            if records is not None and key in records:
+                self._remove(key)
+                FileStorage.__dirty.discard(key)
+        FileStorage.__raw.update(classes)
+
+    def _one_per_line(self, path):
+        """
+        Tells whether the snapshot at path holds one object per line.
+        """
+        try:
+            with codec.open_file(path) as file:
+                return file.read(2) == b"{\n"
+        except codec.ERRORS:
+            return False
+
+    def _shard_names(self):
+        """
+        Returns the class names that have a shard on disk.
+        """
+        prefix, suffix = FileStorage._shard_path.split("{}")
+        return [path[len(prefix):len(path) - len(suffix)]
+                for path in glob.glob(FileStorage._shard_path.format("*"))]
+
+    def _load_shard(self, class_name):
+        """
+        Deserializes the shard of class_name unless it was already loaded.
+        Objects already in memory take precedence over their stored copy.
+        """
+        if class_name in FileStorage.__loaded:
+            return
+        FileStorage.__loaded.add(class_name)
+        path = FileStorage._shard_path.format(class_name)
+        if not os.path.isfile(path):
+            return
+        batch = {}
+        try:
+            with open(path, "rb") as file:
+                items = codec.CODECS["json"].items(
+                    file, stream=FileStorage._streaming)
+                self._build(((key, value) for key, value in items
+                             if key not in FileStorage.__objects), batch)
+        except Exception as error:
+            self._quarantine(path, error)
+        with FileStorage.__lock:
+            # not a change of the transaction in progress, if any
+            undo = FileStorage.__undo
+            FileStorage.__undo = None
+            try:
+                self._insert_many(batch)
+            finally:
+                FileStorage.__undo = undo
+        self._clean(batch)
+
+    def _quarantine(self, path, error):
+        """
+        Moves an unreadable storage file aside to <path>.corrupt, so the
+        next save does not overwrite it, and reports it on stderr.
+        """
+        os.replace(path, path + ".corrupt")
+        print(f"** {path} could not be loaded ({error!r}), "
+              f"moved to {path}.corrupt **", file=sys.stderr)
+
+    def _save_shards(self):
+        """
+        Rewrites the shard of every class that has changed objects.
+        """
+        for class_name in {key.split(".", 1)[0] for key in FileStorage.__dirty}:
+            self._load_shard(class_name)
+            objects = self._class_index().get(class_name, {})
+            parts = [f"{json.dumps(key)}: {self._fragment(key, obj)}"
+                     for key, obj in objects.items()]
+            path = FileStorage._shard_path.format(class_name)
+            if parts:
+                _write_atomic(path, self._document(parts),
+                              FileStorage._durability)
+            elif os.path.isfile(path):
+                os.remove(path)
+        FileStorage.__dirty.clear()
+
+    def _read_snapshot(self, name, batch):
+        """
+        Reads _file_path, written by the codec called name, and builds
+        its objects into batch, unless its records are kept raw until
+        their class is accessed.
+        """
+        path = FileStorage._file_path
+        if name == "indexed":
+            with FileStorage.__lock:
+                self._map_snapshot(path)
+        elif (FileStorage._lazy or FileStorage._cache_size > 0) and \
+                self._one_per_line(path):
+            with FileStorage.__lock:
+                self._read_raw(path)
+        elif self._parallel():
+            # the built objects are unpickled one at a time by this
+            # process, which bounds the speedup whatever the workers
+            context = multiprocessing.get_context("fork")
+            with context.Pool(FileStorage._workers) as pool:
+                for objects in pool.starmap(_build_range, [
+                        (path, start, end, name) for start, end in
+                        _line_ranges(path, FileStorage._workers)]):
+                    batch.update(objects)
+        else:
+            with codec.open_file(path) as file:
+                self._build(codec.CODECS[name].items(
+                    file, stream=FileStorage._streaming), batch)
+
+    def reload(self):
+        """
+        Deserializes the file specified by _file_path,
+        then replays the journal recorded since.
+        In the sharded layout, shards are read again on next access.
+        """
+        if type(self)._sharded:
+            FileStorage.__loaded.clear()
+            return
+        path = FileStorage._file_path
+        snapshot_codec = self._snapshot_codec()
+        batch = {}
+        if os.path.isfile(path):
+            try:
+                # a file whose codec cannot be told is read as JSON,
+                # which fails and moves it aside
+                self._read_snapshot(snapshot_codec or "json", batch)
+            except Exception as error:
+                self._quarantine(path, error)
+        with FileStorage.__lock:
+            self._insert_records(batch)
+        loaded = list(batch)
+        FileStorage.__journal_size = 0
+        FileStorage.__offset = None
+        if snapshot_codec == "ndjson" and os.path.isfile(path):
+            with open(path, "rb") as file:
+                FileStorage.__offset = _complete_length(file)
+        if os.path.isfile(FileStorage._journal_path):
+            with open(FileStorage._journal_path, "r+b") as file:
+                for line in iter(file.readline, b""):
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # torn write from a crash, drop it so that
+                        # later appends are not hidden behind it
+                        file.seek(-len(line), os.SEEK_CUR)
+                        file.truncate()
+                        break
+                    key = record["key"]
+                    if record["op"] == "delete":
+                        self._remove(key)
+                    else:
+                        self.add(self._from_record(key, record["value"]))
+                    loaded.append(key)
+                    FileStorage.__journal_size += 1
+        self._clean(loaded)
+        self._evict()
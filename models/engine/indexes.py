@@ -0,0 +1,474 @@
+#!/usr/bin/python3
+"""
+Module for the secondary indexes kept by the storage engines
+"""
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+
+EARTH_RADIUS_KM = 6371.0088
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Returns the lowercase words of text"""
+    return WORD.findall(str(text).lower())
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Returns the great-circle distance in km between two points"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + \
+        math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+class HashIndex:
+    """
+    Maps the values of one attribute to the ids of the objects of a
+    class holding them. Objects whose value is unhashable are not indexed.
+
+    cache is left to the users of the index to store data derived from
+    the ids of a value; the entry of a value is dropped whenever its
+    ids change.
+    """
+
+    def __init__(self, attribute):
+        """Initializes an empty index over attribute"""
+        self.attribute = attribute
+        self.attributes = (attribute,)
+        self.cache = {}
+        self.__ids = {}
+        self.__values = {}
+
+    def update(self, obj):
+        """
+        Indexes obj under the current value of its attribute.
+        """
+        value = getattr(obj, self.attribute, None)
+        if obj.id in self.__values and self.__values[obj.id] == value:
+            return
+        self.remove(obj.id)
+        try:
+            self.__ids.setdefault(value, set()).add(obj.id)
+        except TypeError:
+            return
+        self.__values[obj.id] = value
+        self.cache.pop(value, None)
+
+    def remove(self, obj_id):
+        """
+        Removes the id of an object, returning the value it was indexed under.
+        """
+        if obj_id not in self.__values:
+            return None
+        value = self.__values.pop(obj_id)
+        ids = self.__ids[value]
+        ids.discard(obj_id)
+        if not ids:
+            del self.__ids[value]
+        self.cache.pop(value, None)
+        return value
+
+    def lookup(self, value):
+        """
+        Returns the set of ids of the objects holding value.
+        The set belongs to the index and must not be modified.
+        """
+        return self.__ids.get(value, frozenset())
+
+    def __len__(self):
+        """Returns the number of indexed objects"""
+        return len(self.__values)
+
+
+class _Top:
+    """Compares greater than anything, to bound (value, id) pairs"""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_TOP = _Top()
+
+
+class SortedList:
+    """
+    Sorted sequence kept as a list of blocks of bounded size, so that an
+    insertion or a removal only shifts one block instead of the whole
+    sequence.
+    """
+    block_size = 512
+
+    def __init__(self, items=()):
+        """Initializes the list with items, sorting them once"""
+        items = sorted(items)
+        size = self.block_size
+        self.__blocks = [items[i:i + size] for i in range(0, len(items), size)]
+        self.__maxes = [block[-1] for block in self.__blocks]
+        self.__len = len(items)
+
+    def add(self, item):
+        """Inserts item at its sorted position"""
+        blocks, maxes = self.__blocks, self.__maxes
+        if not blocks:
+            blocks.append([item])
+            maxes.append(item)
+        else:
+            i = bisect_left(maxes, item)
+            if i == len(maxes):
+                i -= 1
+                blocks[i].append(item)
+                maxes[i] = item
+            else:
+                insort(blocks[i], item)
+            if len(blocks[i]) > 2 * self.block_size:
+                half = blocks[i][self.block_size:]
+                del blocks[i][self.block_size:]
+                maxes[i] = blocks[i][-1]
+                blocks.insert(i + 1, half)
+                maxes.insert(i + 1, half[-1])
+        self.__len += 1
+
+    def remove(self, item):
+        """Removes item, which must be in the list"""
+        i = bisect_left(self.__maxes, item)
+        block = self.__blocks[i]
+        del block[bisect_left(block, item)]
+        if block:
+            self.__maxes[i] = block[-1]
+        else:
+            del self.__blocks[i]
+            del self.__maxes[i]
+        self.__len -= 1
+
+    def irange(self, low, high):
+        """Yields the items from low (included) to high (excluded)"""
+        i = bisect_left(self.__maxes, low)
+        if i == len(self.__blocks):
+            return
+        j = bisect_left(self.__blocks[i], low)
+        for block in self.__blocks[i:]:
+            for item in block[j:]:
+                if not item < high:
+                    return
+                yield item
+            j = 0
+
+    def count(self, low, high):
+        """Returns the number of items from low (included) to high (excluded)"""
+        maxes = self.__maxes
+        first, last = bisect_left(maxes, low), bisect_left(maxes, high)
+        if first == len(maxes) or not low < high:
+            return 0
+        if first == last:
+            block = self.__blocks[first]
+            return bisect_left(block, high) - bisect_left(block, low)
+        total = len(self.__blocks[first]) - bisect_left(self.__blocks[first], low)
+        total += sum(len(block) for block in self.__blocks[first + 1:last])
+        if last < len(maxes):
+            total += bisect_left(self.__blocks[last], high)
+        return total
+
+    def __len__(self):
+        """Returns the number of items"""
+        return self.__len
+
+
+class RangeIndex:
+    """
+    Keeps the ids of the objects of a class sorted by a numeric attribute.
+    Objects whose value is not a number are not indexed.
+    """
+
+    def __init__(self, attribute):
+        """Initializes an empty index over attribute"""
+        self.attribute = attribute
+        self.attributes = (attribute,)
+        self.__entries = SortedList()
+        self.__values = {}
+
+    def _value(self, obj):
+        """Returns the indexable value of obj, or None"""
+        value = getattr(obj, self.attribute, None)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+        return None
+
+    def update(self, obj):
+        """
+        Indexes obj under the current value of its attribute.
+        """
+        value = self._value(obj)
+        if obj.id in self.__values and self.__values[obj.id] == value:
+            return
+        self.remove(obj.id)
+        if value is not None:
+            self.__entries.add((value, obj.id))
+            self.__values[obj.id] = value
+
+    def rebuild(self, objects):
+        """
+        Replaces the content of the index with objects, sorting once.
+        """
+        self.__values = {}
+        for obj in objects:
+            value = self._value(obj)
+            if value is not None:
+                self.__values[obj.id] = value
+        self.__entries = SortedList((value, obj_id) for obj_id, value
+                                    in self.__values.items())
+
+    def remove(self, obj_id):
+        """
+        Removes the id of an object, returning the value it was indexed under.
+        """
+        if obj_id not in self.__values:
+            return None
+        value = self.__values.pop(obj_id)
+        self.__entries.remove((value, obj_id))
+        return value
+
+    def range(self, low=None, high=None):
+        """
+        Returns the ids of the objects whose value is between low and
+        high, both included, ordered by value. None leaves a bound open.
+        """
+        return [obj_id for value, obj_id in self.__entries.irange(
+            *self.__bounds(low, high))]
+
+    def count(self, low=None, high=None):
+        """
+        Returns the number of objects whose value is between low and high.
+        """
+        return self.__entries.count(*self.__bounds(low, high))
+
+    def __bounds(self, low, high):
+        """Returns the (value, id) pairs bounding [low, high]"""
+        low = (float("-inf"),) if low is None else (low,)
+        high = (float("inf"), _TOP) if high is None else (high, _TOP)
+        return low, high
+
+    def __len__(self):
+        """Returns the number of indexed objects"""
+        return len(self.__values)
+
+
+class GridIndex:
+    """
+    Buckets the ids of the objects of a class into a grid of cells of
+    cell_size degrees by their latitude and longitude attributes.
+    Objects without numeric coordinates are not indexed.
+    """
+    cell_size = 0.25
+
+    def __init__(self, lat_attribute, lon_attribute):
+        """Initializes an empty index over the two attributes"""
+        self.attributes = (lat_attribute, lon_attribute)
+        self.__cells = {}
+        self.__points = {}
+        self.__columns = round(360 / self.cell_size)
+
+    def __cell(self, lat, lon):
+        """Returns the cell holding a point"""
+        return (math.floor(lat / self.cell_size),
+                math.floor(lon / self.cell_size) % self.__columns)
+
+    def update(self, obj):
+        """
+        Indexes obj under its current coordinates.
+        """
+        point = tuple(getattr(obj, attribute, None)
+                      for attribute in self.attributes)
+        if self.__points.get(obj.id) == point:
+            return
+        self.remove(obj.id)
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool)
+               for value in point):
+            self.__points[obj.id] = point
+            self.__cells.setdefault(self.__cell(*point), set()).add(obj.id)
+
+    def remove(self, obj_id):
+        """
+        Removes the id of an object, returning the point it was indexed at.
+        """
+        point = self.__points.pop(obj_id, None)
+        if point is not None:
+            cell = self.__cell(*point)
+            self.__cells[cell].discard(obj_id)
+            if not self.__cells[cell]:
+                del self.__cells[cell]
+        return point
+
+    def within(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        Returns the ids of the objects inside a bounding box.
+        A box with min_lon > max_lon crosses the antimeridian.
+        """
+        rows = range(math.floor(min_lat / self.cell_size),
+                     math.floor(max_lat / self.cell_size) + 1)
+        first = math.floor(min_lon / self.cell_size)
+        last = math.floor(max_lon / self.cell_size)
+        if min_lon > max_lon:
+            last += self.__columns
+        columns = {column % self.__columns
+                   for column in range(first, min(last, first + self.__columns) + 1)}
+        if len(rows) * len(columns) <= len(self.__cells):
+            cells = (self.__cells.get((row, column), ())
+                     for row in rows for column in columns)
+        else:
+            cells = (ids for (row, column), ids in self.__cells.items()
+                     if row in rows and column in columns)
+
+        def inside(lat, lon):
+            if not min_lat <= lat <= max_lat:
+                return False
+            if min_lon <= max_lon:
+                return min_lon <= lon <= max_lon
+            return lon >= min_lon or lon <= max_lon
+
+        return [obj_id for ids in cells for obj_id in ids
+                if inside(*self.__points[obj_id])]
+
+    def near(self, lat, lon, k):
+        """
+        Returns up to k (distance_km, id) pairs, nearest first, searching
+        rings of cells around the point until no unvisited cell can hold
+        a nearer object. The rings stop at the rows holding objects, or
+        once they visited as many cells as hold objects, and the
+        remaining search scans every object instead.
+        """
+        if k <= 0 or not self.__points:
+            return []
+        if k >= len(self.__points):
+            return self.__scan(lat, lon, k)
+        row, column = self.__cell(lat, lon)
+        rows = [cell_row for cell_row, _ in self.__cells]
+        last_ring = max(abs(row - min(rows)), abs(max(rows) - row))
+        heap = []
+        seen = 0
+        visited = 0
+        for ring in range(last_ring + 1):
+            cells = self.__ring(row, column, ring)
+            visited += len(cells)
+            for cell in cells:
+                for obj_id in self.__cells.get(cell, ()):
+                    seen += 1
+                    distance = distance_km(lat, lon, *self.__points[obj_id])
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-distance, obj_id))
+                    elif distance < -heap[0][0]:
+                        heapq.heapreplace(heap, (-distance, obj_id))
+            if seen == len(self.__points):
+                break
+            if len(heap) == k and -heap[0][0] <= self.__reach(lat, ring):
+                break
+            if visited >= len(self.__cells):
+                return self.__scan(lat, lon, k)
+        else:
+            return self.__scan(lat, lon, k)
+        return sorted((-distance, obj_id) for distance, obj_id in heap)
+
+    def __scan(self, lat, lon, k):
+        """Returns the k nearest (distance_km, id) pairs of all objects"""
+        return heapq.nsmallest(k, ((distance_km(lat, lon, *point), obj_id)
+                                   for obj_id, point in self.__points.items()))
+
+    def __ring(self, row, column, ring):
+        """Yields the distinct cells at Chebyshev distance ring of a cell"""
+        columns = self.__columns
+        cells = set()
+        for offset in range(-ring, ring + 1):
+            cells.add((row - ring, (column + offset) % columns))
+            cells.add((row + ring, (column + offset) % columns))
+            cells.add((row + offset, (column - ring) % columns))
+            cells.add((row + offset, (column + ring) % columns))
+        return cells
+
+    def __reach(self, lat, ring):
+        """
+        Returns a lower bound of the distance from a point to any object
+        outside the rings 0 to ring around its cell.
+        """
+        degrees = ring * self.cell_size
+        by_lat = math.radians(degrees) * EARTH_RADIUS_KM
+        top = math.radians(min(90.0, abs(lat) + degrees + self.cell_size))
+        half = math.radians(min(degrees, 180.0)) / 2
+        by_lon = 2 * EARTH_RADIUS_KM * math.asin(
+            min(1.0, math.cos(top) * math.sin(half)))
+        return min(by_lat, by_lon)
+
+    def __len__(self):
+        """Returns the number of indexed objects"""
+        return len(self.__points)
+
+
+class TextIndex:
+    """
+    Inverted index of the words of some text attributes: each word maps
+    to the ids of the objects using it and how many times they do.
+    """
+
+    def __init__(self, *attributes):
+        """Initializes an empty index over attributes"""
+        self.attributes = attributes
+        self.__postings = {}
+        self.__words = {}
+
+    def update(self, obj):
+        """
+        Indexes obj under the words of its current text.
+        """
+        words = {}
+        for attribute in self.attributes:
+            value = getattr(obj, attribute, None)
+            if value:
+                for word in tokenize(value):
+                    words[word] = words.get(word, 0) + 1
+        if self.__words.get(obj.id) == words:
+            return
+        self.remove(obj.id)
+        if words:
+            self.__words[obj.id] = words
+            for word, count in words.items():
+                self.__postings.setdefault(word, {})[obj.id] = count
+
+    def remove(self, obj_id):
+        """
+        Removes the id of an object, returning its word counts.
+        """
+        words = self.__words.pop(obj_id, None)
+        for word in words or ():
+            postings = self.__postings[word]
+            del postings[obj_id]
+            if not postings:
+                del self.__postings[word]
+        return words
+
+    def search(self, query, mode="and"):
+        """
+        Returns (score, id) pairs for the objects using all the words of
+        query ("and") or any of them ("or"), best first. The score is the
+        number of times the object uses the words of the query.
+        """
+        postings = [self.__postings.get(word, {}) for word in set(tokenize(query))]
+        if not postings:
+            return []
+        if mode == "and":
+            postings.sort(key=len)
+            ids = set(postings[0]).intersection(*postings[1:])
+        elif mode == "or":
+            ids = set().union(*postings)
+        else:
+            raise ValueError("mode must be 'and' or 'or'")
+        scores = ((sum(posting.get(obj_id, 0) for posting in postings), obj_id)
+                  for obj_id in ids)
+        return sorted(scores, key=lambda pair: (-pair[0], pair[1]))
+
+    def __len__(self):
+        """Returns the number of indexed objects"""
+        return len(self.__words)
@@ -2,7 +2,10 @@
 """
 This module defines the Place class.
 """
+import models
 from models.base_model import BaseModel
+from models.amenity import Amenity
+from models.review import Review
 
 
 class Place(BaseModel):
@@ -33,3 +36,21 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+
+    _indexes = ("city_id", "user_id")
+    _range_indexes = ("number_rooms", "number_bathrooms", "max_guest",
+                      "price_by_night")
+    _spatial_index = ("latitude", "longitude")
+    _text_index = ("name", "description")
+
+    @property
+    def reviews(self):
+        """Review instances whose place_id is this place"""
+        return models.storage.related(Review, "place_id", self.id)
+
+    @property
+    def amenities(self):
+        """Amenity instances listed in amenity_ids"""
+        amenities = (models.storage.get(Amenity, amenity_id)
+                     for amenity_id in self.amenity_ids)
+        return [amenity for amenity in amenities if amenity is not None]
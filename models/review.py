@@ -15,3 +15,6 @@ class Review(BaseModel):
     place_id = ""
     user_id = ""
     text = ""
+
+    _indexes = ("place_id", "user_id")
+    _text_index = ("text",)
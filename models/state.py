@@ -2,7 +2,9 @@
 """
 State class module.
 """
+import models
 from models.base_model import BaseModel
+from models.city import City
 
 
 class State(BaseModel):
@@ -14,3 +16,8 @@ class State(BaseModel):
     """
 
     name = ""
+
+    @property
+    def cities(self):
+        """City instances whose state_id is this state"""
+        return models.storage.related(City, "state_id", self.id)
@@ -2,7 +2,10 @@
 """
 This module implements the User class.
 """
+import models
 from models.base_model import BaseModel
+from models.place import Place
+from models.review import Review
 
 
 class User(BaseModel):
@@ -13,3 +16,13 @@ class User(BaseModel):
     password = ""
     first_name = ""
     last_name = ""
+
+    @property
+    def places(self):
+        """Place instances whose user_id is this user"""
+        return models.storage.related(Place, "user_id", self.id)
+
+    @property
+    def reviews(self):
+        """Review instances whose user_id is this user"""
+        return models.storage.related(Review, "user_id", self.id)
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+"""
+Rewrites a storage file with another codec, whatever the codec and
+the compression it was written with.
+
+Usage: ./scripts/convert_storage.py SOURCE DESTINATION json|binary|indexed|ndjson
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(source, destination, codec_name):
+    # importing models reloads the storage of the working directory,
+    # run from an empty one so that its files are neither read nor
+    # moved aside
+    os.chdir(tempfile.mkdtemp())
+    from models.engine import codec
+    if codec_name not in codec.CODECS:
+        sys.exit(__doc__.strip().splitlines()[-1])
+    print(codec.convert(source, destination, codec_name), "objects converted")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        sys.exit(__doc__.strip().splitlines()[-1])
+    main(os.path.abspath(sys.argv[1]), os.path.abspath(sys.argv[2]),
+         sys.argv[3])
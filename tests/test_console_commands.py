@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+Module for HBNBConsole commands unittest
+"""
+import contextlib
+import io
+import os
+import unittest
+from console import HBNBConsole
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+
+class TestHBNBConsoleCommands(unittest.TestCase):
+    """
+    Unittests for the create, search, transaction and update
+    commands of the HBNBConsole class.
+    """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "temp_file.json")
+        except FileNotFoundError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        if FileStorage._FileStorage__undo is not None:
+            storage.rollback()
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except FileNotFoundError:
+            pass
+        try:
+            os.rename("temp_file.json", "file.json")
+        except FileNotFoundError:
+            pass
+
+    def run_command(self, line):
+        """Runs a console command and returns what it printed"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            HBNBConsole().onecmd(line)
+        return output.getvalue()
+
+    def test_create_count(self):
+        ids = self.run_command("create Place 3").split()
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(sorted(ids), sorted(
+            obj.id for obj in storage.all(Place).values()))
+
+    def test_create_count_below_one(self):
+        self.assertEqual(self.run_command("create Place 0"),
+                         "** count must be at least 1 **\n")
+        self.assertEqual(storage.count(), 0)
+
+    def test_create_parameters(self):
+        obj_id = self.run_command(
+            'create Place name="My house" number_rooms=4 latitude=1.5 '
+            'amenity_ids=["a"] description=Cosy').strip()
+        my_place = storage.get(Place, obj_id)
+        self.assertEqual(my_place.name, "My house")
+        self.assertEqual(my_place.number_rooms, 4)
+        self.assertEqual(my_place.latitude, 1.5)
+        self.assertEqual(my_place.amenity_ids, ["a"])
+        self.assertEqual(my_place.description, "Cosy")
+
+    def test_create_count_copies_values(self):
+        first, second = (storage.get(Place, obj_id) for obj_id in
+                         self.run_command(
+                             'create Place 2 amenity_ids=["a"]').split())
+        first.amenity_ids.append("z")
+        self.assertEqual(second.amenity_ids, ["a"])
+
+    def test_create_quoted_list(self):
+        obj_id = self.run_command(
+            """create Place amenity_ids='["a", "b"]'""").strip()
+        self.assertEqual(storage.get(Place, obj_id).amenity_ids, ["a", "b"])
+
+    def test_create_invalid_parameter(self):
+        self.assertEqual(self.run_command("create User nonsense"),
+                         "** invalid parameter: nonsense **\n")
+        self.assertEqual(self.run_command("create User =Ada"),
+                         "** invalid parameter: =Ada **\n")
+        self.assertEqual(storage.count(), 0)
+
+    def test_invalid_number(self):
+        self.assertEqual(self.run_command("create Place number_rooms=x"),
+                         "** invalid value **\n")
+        self.assertEqual(storage.count(), 0)
+        my_place = Place()
+        self.assertEqual(self.run_command(
+            f'update Place {my_place.id} latitude "north"'),
+            "** invalid value **\n")
+        self.assertEqual(my_place.latitude, 0.0)
+
+    def test_search(self):
+        loft = Place()
+        loft.name = "Sunny loft"
+        barn = Place()
+        barn.name = "Old barn"
+        self.assertEqual(self.run_command("search Place loft"),
+                         f"{loft}\n")
+        self.assertEqual(self.run_command('Place.search("barn")'),
+                         f"{barn}\n")
+        self.assertEqual(len(self.run_command(
+            "search loft OR barn").splitlines()), 2)
+        self.assertEqual(self.run_command("search Place"),
+                         "** search words missing **\n")
+
+    def test_rollback(self):
+        self.run_command("begin")
+        self.run_command("create User")
+        self.assertEqual(self.run_command("rollback"), "")
+        self.assertEqual(storage.count(), 0)
+
+    def test_commit(self):
+        self.run_command("begin")
+        obj_id = self.run_command("create User").strip()
+        self.assertEqual(self.run_command("commit"), "")
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertIsNotNone(storage.get(User, obj_id))
+
+    def test_no_transaction(self):
+        self.assertEqual(self.run_command("commit"),
+                         "** no transaction in progress **\n")
+        self.assertEqual(self.run_command("rollback"),
+                         "** no transaction in progress **\n")
+
+    def test_update_coerces_values(self):
+        my_place = Place()
+        self.run_command(f'update Place {my_place.id} number_rooms "4"')
+        self.run_command(f'update Place {my_place.id} latitude "2.5"')
+        self.run_command(f'update Place {my_place.id} name "Loft"')
+        self.assertEqual(my_place.number_rooms, 4)
+        self.assertEqual(my_place.latitude, 2.5)
+        self.assertEqual(my_place.name, "Loft")
+
+    def test_update_dictionary(self):
+        my_place = Place()
+        self.run_command(f'Place.update("{my_place.id}", '
+                         '{"max_guest": 6, "name": "Barn"})')
+        self.assertEqual(my_place.max_guest, 6)
+        self.assertEqual(my_place.name, "Barn")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Module for cache unittest
+"""
+import glob
+import os
+import unittest
+from models.engine.cache import DiskRecords, DiskStore
+
+
+class TestDiskRecords(unittest.TestCase):
+    """
+    Unittests for testing the DiskStore and DiskRecords classes.
+    """
+
+    def setUp(self):
+        self.store = DiskStore("cache.test")
+        self.base = {"User.2": '{"id": "2"}'}
+        self.records = DiskRecords(self.store, self.base)
+
+    def tearDown(self):
+        self.store.close()
+        for path in glob.glob("cache.test*"):
+            os.remove(path)
+
+    def test_write_and_read(self):
+        self.records["User.1"] = '{"id": "1"}'
+        self.assertEqual(self.records["User.1"], '{"id": "1"}')
+        self.assertEqual(self.records["User.2"], '{"id": "2"}')
+        self.assertEqual(sorted(self.records), ["User.1", "User.2"])
+        self.assertEqual(len(self.records), 2)
+        self.assertNotIn("User.3", self.records)
+        with self.assertRaises(KeyError):
+            self.records["User.3"]
+
+    def test_delete(self):
+        self.records["User.1"] = '{"id": "1"}'
+        del self.records["User.1"]
+        del self.records["User.2"]
+        self.assertEqual(len(self.records), 0)
+        self.assertEqual(self.base, {})
+        with self.assertRaises(KeyError):
+            del self.records["User.1"]
+
+    def test_restore(self):
+        self.assertFalse(self.records.restore("User.1", '{"id": "1"}'))
+        self.records["User.1"] = '{"id": "1"}'
+        self.assertEqual(self.records.pop("User.1"), '{"id": "1"}')
+        self.assertNotIn("User.1", self.records)
+        self.assertFalse(self.records.restore("User.1", '{"id": "one"}'))
+        self.assertTrue(self.records.restore("User.1", '{"id": "1"}'))
+        self.assertEqual(self.records["User.1"], '{"id": "1"}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,472 @@
+#!/usr/bin/python3
+"""
+Module for codec unittest
+"""
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import unittest
+from datetime import datetime
+import models
+from models.engine import codec
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+
+class TestBinaryCodec(unittest.TestCase):
+    """
+    Unittests for testing the BinaryCodec class.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.place = Place()
+        self.place.city_id = "8f5d4b86-1f6b-4d0e-9c35-4a1ab3c0bd2e"
+        self.place.name = "Loft é"
+        self.place.number_rooms = 3
+        self.place.price_by_night = -2 ** 70
+        self.place.latitude = 37.77
+        self.place.amenity_ids = ["a", 1, None, True, False]
+        self.place.extra = {"nested": [1.5, {"x": "y"}]}
+        self.place.not_a_uuid = "8f5d4b86-1f6b-4d0e-9c35-4A1AB3C0BD2E"
+        self.user = User()
+        self.objects = {"Place." + self.place.id: self.place,
+                        "User." + self.user.id: self.user}
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_round_trip(self):
+        data = codec.CODECS["binary"].encode(self.objects)
+        self.assertTrue(data.startswith(codec.MAGIC))
+        decoded = codec.CODECS["binary"].decode(data)
+        self.assertEqual(decoded.keys(), self.objects.keys())
+        self.assertEqual(decoded["Place." + self.place.id],
+                         self.place.__dict__)
+        self.assertIsInstance(decoded["User." + self.user.id]["created_at"],
+                              datetime)
+
+    def test_smaller_than_json(self):
+        binary = codec.CODECS["binary"].encode(self.objects)
+        text = codec.CODECS["json"].encode(self.objects)
+        self.assertLess(len(binary), len(text))
+
+    def test_detect(self):
+        for name in ("json", "binary"):
+            data = codec.CODECS[name].encode(self.objects)
+            self.assertEqual(codec.detect(data).name, name)
+
+    def test_truncated(self):
+        data = codec.CODECS["binary"].encode(self.objects)
+        with self.assertRaises(Exception):
+            codec.CODECS["binary"].decode(data[:-3])
+        with self.assertRaises(ValueError):
+            codec.CODECS["binary"].decode(data + b"\0")
+
+    def test_unsupported_value(self):
+        self.user.friends = {1, 2}
+        with self.assertRaises(TypeError):
+            codec.CODECS["binary"].encode(self.objects)
+
+
+class TestConvert(unittest.TestCase):
+    """
+    Unittests for testing the conversion of storage files.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.paths = ("codec.json", "codec.bin", "codec.back.json")
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        for path in self.paths:
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def test_json_to_binary_and_back(self):
+        users = {"User." + user.id: user for user in (User(), User())}
+        with open(self.paths[0], "wb") as f:
+            f.write(codec.CODECS["json"].encode(users))
+        self.assertEqual(codec.convert(self.paths[0], self.paths[1],
+                                       "binary"), 2)
+        self.assertEqual(codec.convert(self.paths[1], self.paths[2],
+                                       "json"), 2)
+        with open(self.paths[0], "r") as first, \
+                open(self.paths[2], "r") as last:
+            self.assertEqual(json.load(first), json.load(last))
+
+    def test_script_leaves_storage_alone(self):
+        users = {"User." + user.id: user for user in (User(), User())}
+        with open(self.paths[0], "wb") as f:
+            f.write(codec.CODECS["json"].encode(users))
+        with open(FileStorage._file_path, "w") as f:
+            f.write("{")
+        self.addCleanup(os.remove, FileStorage._file_path)
+        script = os.path.join(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))),
+            "scripts", "convert_storage.py")
+        result = subprocess.run(
+            [sys.executable, script, self.paths[0], self.paths[1], "ndjson"],
+            capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout, "2 objects converted\n")
+        self.assertEqual(result.stderr, "")
+        with open(FileStorage._file_path, "r") as f:
+            self.assertEqual(f.read(), "{")
+        with open(self.paths[1], "rb") as f:
+            self.assertEqual(codec.detect(f.read()).name, "ndjson")
+
+
+class TestCompression(unittest.TestCase):
+    """
+    Unittests for testing the compression of storage files.
+    """
+
+    def tearDown(self):
+        if os.path.isfile("codec.z"):
+            os.remove("codec.z")
+
+    def test_round_trip(self):
+        data = b'{"User.1": {"id": "1"}}' * 100
+        for compression in codec.COMPRESSIONS:
+            for level in (None, 1, 9):
+                packed = codec.compress(data, compression, level)
+                self.assertLess(len(packed), len(data))
+                with open("codec.z", "wb") as f:
+                    f.write(packed)
+                self.assertEqual(codec.compression_of("codec.z"), compression)
+                with codec.open_file("codec.z") as f:
+                    self.assertEqual(f.read(), data)
+
+    def test_uncompressed(self):
+        with open("codec.z", "wb") as f:
+            f.write(b"{}")
+        self.assertIsNone(codec.compression_of("codec.z"))
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            codec.compress(b"{}", "bz2")
+
+
+class TestIndexedCodec(unittest.TestCase):
+    """
+    Unittests for testing the IndexedCodec and MappedSnapshot classes.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.users = [User() for _ in range(40)]
+        self.places = [Place() for _ in range(5)]
+        self.objects = dict(models.storage.all())
+        self.data = codec.CODECS["indexed"].encode(self.objects)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_round_trip(self):
+        self.assertEqual(codec.detect(self.data).name, "indexed")
+        decoded = codec.CODECS["indexed"].decode(self.data)
+        self.assertEqual(decoded, {key: obj.to_dict()
+                                   for key, obj in self.objects.items()})
+
+    def test_records(self):
+        classes = codec.MappedSnapshot(self.data).classes()
+        self.assertEqual(sorted(classes), ["Place", "User"])
+        users = classes["User"]
+        self.assertEqual(len(users), 40)
+        self.assertEqual(list(users), sorted(f"User.{user.id}"
+                                             for user in self.users))
+        key = f"User.{self.users[7].id}"
+        self.assertIn(key, users)
+        self.assertNotIn(f"Place.{self.users[7].id}", users)
+        self.assertNotIn("User.0", users)
+        self.assertEqual(json.loads(users[key]), self.users[7].to_dict())
+        del users[key]
+        self.assertNotIn(key, users)
+        self.assertEqual(len(users), 39)
+        with self.assertRaises(KeyError):
+            users[key]
+        with self.assertRaises(TypeError):
+            users[key] = "{}"
+
+    def test_not_indexed(self):
+        with self.assertRaises(ValueError):
+            codec.MappedSnapshot(self.data[:-1])
+
+
+class TestNDJSONCodec(unittest.TestCase):
+    """
+    Unittests for testing the NDJSONCodec class and read_records().
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.users = [User() for _ in range(3)]
+        self.objects = dict(models.storage.all())
+        self.data = codec.CODECS["ndjson"].encode(self.objects)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_round_trip(self):
+        self.assertEqual(codec.detect(self.data).name, "ndjson")
+        self.assertEqual(codec.detect(b"").name, "ndjson")
+        lines = self.data.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0]),
+                         {"key": f"User.{self.users[0].id}",
+                          "value": self.users[0].to_dict()})
+        decoded = codec.CODECS["ndjson"].decode(self.data)
+        self.assertEqual(decoded, {key: obj.to_dict()
+                                   for key, obj in self.objects.items()})
+
+    def test_appended_records(self):
+        ndjson = codec.CODECS["ndjson"]
+        key = f"User.{self.users[1].id}"
+        data = self.data + ndjson.record(key, None).encode("utf-8")
+        data += ndjson.record(key, '{"id": "x"}').encode("utf-8")
+        data += ndjson.record(f"User.{self.users[2].id}", None).encode()
+        decoded = ndjson.decode(data)
+        self.assertEqual(list(decoded), [f"User.{self.users[0].id}", key])
+        self.assertEqual(decoded[key], {"id": "x"})
+
+    def test_resume_from_offset(self):
+        records = list(codec.read_records(io.BytesIO(self.data)))
+        self.assertEqual(records[-1][2], len(self.data))
+        offset = records[0][2]
+        resumed = list(codec.read_records(io.BytesIO(self.data), offset))
+        self.assertEqual(resumed, records[1:])
+        # a range holds the lines starting inside it
+        ranged = list(codec.read_records(io.BytesIO(self.data), 1, offset + 1))
+        self.assertEqual(ranged, records[1:2])
+
+    def test_unterminated_line(self):
+        records = list(codec.read_records(io.BytesIO(self.data[:-5])))
+        self.assertEqual(len(records), 2)
+        with self.assertRaises(ValueError):
+            list(codec.read_records(io.BytesIO(b'["User.1"]\n')))
+
+
+class TestFileStorageCodec(unittest.TestCase):
+    """
+    Unittests for the binary and compressed snapshots of the
+    FileStorage class.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._codec = "binary"
+
+    def tearDown(self):
+        FileStorage._codec = "json"
+        FileStorage._FileStorage__objects = {}
+        for path in (FileStorage._file_path,
+                     FileStorage._file_path + ".corrupt"):
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def test_save_and_reload(self):
+        place = Place()
+        place.city_id = "c1"
+        place.price_by_night = 80
+        models.storage.save()
+        with open(FileStorage._file_path, "rb") as f:
+            self.assertTrue(f.read().startswith(codec.MAGIC))
+        FileStorage._codec = "json"
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        reloaded = models.storage.get(Place, place.id)
+        self.assertEqual(reloaded.to_dict(), place.to_dict())
+        self.assertEqual(models.storage.lookup(Place, "city_id", "c1"),
+                         {place.id})
+        models.storage.save()
+        with open(FileStorage._file_path, "r") as f:
+            self.assertIn("Place." + place.id, json.load(f))
+
+    def test_compressed_save_and_reload(self):
+        users = [User() for _ in range(20)]
+        for name in ("json", "binary"):
+            for compression in codec.COMPRESSIONS:
+                FileStorage._codec = name
+                FileStorage._compression = compression
+                try:
+                    models.storage.save()
+                finally:
+                    FileStorage._compression = None
+                self.assertEqual(codec.compression_of(FileStorage._file_path),
+                                 compression)
+                for lazy in (False, True):
+                    FileStorage._lazy = lazy
+                    FileStorage._FileStorage__objects = {}
+                    try:
+                        models.storage.reload()
+                    finally:
+                        FileStorage._lazy = False
+                    self.assertEqual(models.storage.count(User), 20)
+                    self.assertEqual(
+                        models.storage.get(User, users[0].id).to_dict(),
+                        users[0].to_dict())
+
+    def test_reload_of_corrupt_compressed_file(self):
+        FileStorage._codec = "json"
+        User()
+        FileStorage._compression = "gzip"
+        try:
+            models.storage.save()
+        finally:
+            FileStorage._compression = None
+        with open(FileStorage._file_path, "r+b") as f:
+            f.truncate(30)
+        FileStorage._FileStorage__objects = {}
+        with contextlib.redirect_stderr(io.StringIO()):
+            models.storage.reload()
+        self.assertEqual(models.storage.count(), 0)
+        self.assertTrue(os.path.isfile(FileStorage._file_path + ".corrupt"))
+
+    def test_mapped_snapshot(self):
+        FileStorage._codec = "indexed"
+        users = [User() for _ in range(10)]
+        places = [Place() for _ in range(3)]
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(), 13)
+        self.assertEqual(len(FileStorage._FileStorage__objects), 0)
+        user = models.storage.get(User, users[3].id)
+        self.assertEqual(user.to_dict(), users[3].to_dict())
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+        user.first_name = "Betty"
+        models.storage.delete(models.storage.get(User, users[4].id))
+        models.storage.save()
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(User), 9)
+        self.assertEqual(models.storage.get(User, users[3].id).first_name,
+                         "Betty")
+        self.assertEqual(len(models.storage.all(Place)), 3)
+        self.assertEqual(len(models.storage.all()), 12)
+
+    def test_ndjson_appends_changes(self):
+        FileStorage._codec = "ndjson"
+        users = [User() for _ in range(3)]
+        models.storage.save()
+        size = os.path.getsize(FileStorage._file_path)
+        users[0].first_name = "Betty"
+        models.storage.delete(users[1])
+        models.storage.save()
+        with open(FileStorage._file_path, "rb") as f:
+            self.assertEqual(f.read(size).count(b"\n"), 3)
+            appended = [json.loads(line) for line in f]
+        self.assertEqual(sorted(record["key"] for record in appended),
+                         sorted([f"User.{users[0].id}", f"User.{users[1].id}"]))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(User), 2)
+        self.assertEqual(models.storage.get(User, users[0].id).first_name,
+                         "Betty")
+        self.assertIsNone(models.storage.get(User, users[1].id))
+
+    def test_ndjson_compacts(self):
+        FileStorage._codec = "ndjson"
+        FileStorage._journal_limit = 2
+        try:
+            user = User()
+            models.storage.save()
+            for name in ("a", "b"):
+                user.first_name = name
+                models.storage.save()
+        finally:
+            FileStorage._journal_limit = 10000
+        with open(FileStorage._file_path, "rb") as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    def test_ndjson_refresh(self):
+        FileStorage._codec = "ndjson"
+        user = User()
+        models.storage.save()
+        self.assertEqual(models.storage.refresh(), 0)
+        ndjson = codec.CODECS["ndjson"]
+        other = User.from_dict(user.to_dict())
+        other.id = "2"
+        with open(FileStorage._file_path, "a") as f:
+            f.write(ndjson.record(f"User.{user.id}", None))
+            f.write(ndjson.record("User.2", json.dumps(other.to_dict())))
+        self.assertEqual(models.storage.refresh(), 2)
+        self.assertEqual(list(models.storage.all()), ["User.2"])
+        self.assertEqual(models.storage.refresh(), 0)
+
+    def test_ndjson_torn_record(self):
+        FileStorage._codec = "ndjson"
+        users = [User() for _ in range(2)]
+        models.storage.save()
+        with open(FileStorage._file_path, "a") as f:
+            f.write('{"key": "User.3", "val')
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(), 2)
+        User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(), 3)
+        self.assertFalse(os.path.isfile(FileStorage._file_path + ".corrupt"))
+
+    def test_ndjson_reader_leaves_append_in_progress(self):
+        FileStorage._codec = "ndjson"
+        user = User()
+        models.storage.save()
+        other = User.from_dict(user.to_dict())
+        other.id = "2"
+        line = codec.CODECS["ndjson"].record(
+            "User.2", json.dumps(other.to_dict()))
+        with open(FileStorage._file_path, "a") as f:
+            f.write(line[:20])
+        size = os.path.getsize(FileStorage._file_path)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(), 1)
+        self.assertEqual(os.path.getsize(FileStorage._file_path), size)
+        with open(FileStorage._file_path, "a") as f:
+            f.write(line[20:])
+        self.assertEqual(models.storage.refresh(), 1)
+        self.assertEqual(models.storage.count(), 2)
+
+    def test_ndjson_parallel_reload(self):
+        FileStorage._codec = "ndjson"
+        users = [User() for _ in range(30)]
+        models.storage.save()
+        models.storage.delete(users[0])
+        users[1].first_name = "Betty"
+        models.storage.save()
+        FileStorage._workers = 3
+        FileStorage._parallel_min_size = 0
+        FileStorage._FileStorage__objects = {}
+        try:
+            self.assertTrue(models.storage._parallel())
+            models.storage.reload()
+        finally:
+            FileStorage._workers = 0
+            FileStorage._parallel_min_size = 1 << 20
+        self.assertEqual(models.storage.count(User), 29)
+        self.assertEqual(models.storage.get(User, users[1].id).first_name,
+                         "Betty")
+
+    def test_reload_of_corrupt_file(self):
+        User()
+        models.storage.save()
+        with open(FileStorage._file_path, "r+b") as f:
+            f.truncate(40)
+        FileStorage._FileStorage__objects = {}
+        with contextlib.redirect_stderr(io.StringIO()):
+            models.storage.reload()
+        self.assertEqual(models.storage.count(), 0)
+        self.assertTrue(os.path.isfile(FileStorage._file_path + ".corrupt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
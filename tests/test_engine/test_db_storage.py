@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+"""
+Module for DBStorage unittest
+"""
+import glob
+import os
+import sqlite3
+import unittest
+from models.base_model import BaseModel
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.user import User
+from models.place import Place
+from models.city import City
+from models.review import Review
+
+
+class TestDBStorage(unittest.TestCase):
+    """
+    Unittests for testing the DBStorage class.
+    """
+
+    def setUp(self):
+        self.db_path = DBStorage._db_path
+        DBStorage._db_path = "test_hbnb.db"
+        FileStorage._FileStorage__objects = {}
+        self.storage = DBStorage()
+
+    def tearDown(self):
+        self.storage.close()
+        DBStorage._db_path = self.db_path
+        try:
+            os.remove("test_hbnb.db")
+        except FileNotFoundError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def rows(self, query, *params):
+        with sqlite3.connect("test_hbnb.db") as conn:
+            return conn.execute(query, params).fetchall()
+
+    def test_is_a_FileStorage(self):
+        self.assertIsInstance(self.storage, FileStorage)
+
+    def test_one_table_per_class(self):
+        tables = {name for (name,) in self.rows(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertEqual({"BaseModel", "User", "State", "City", "Amenity",
+                          "Place", "Review"}, tables)
+
+    def test_foreign_keys_are_indexed(self):
+        indexes = {(table, column) for table, column in self.rows(
+            "SELECT m.name, i.name FROM sqlite_master m, "
+            "pragma_index_list(m.name) l, pragma_index_info(l.name) i "
+            "WHERE m.type = 'table' AND l.origin = 'c'")}
+        for index in (("City", "state_id"), ("Place", "city_id"),
+                      ("Place", "user_id"), ("Review", "place_id")):
+            self.assertIn(index, indexes)
+
+    def test_save_upserts_rows(self):
+        my_city = City()
+        my_city.state_id = "s1"
+        self.storage.save_to_file()
+        my_city.name = "Lagos"
+        self.storage.save_to_file()
+        rows = self.rows("SELECT id, state_id FROM City")
+        self.assertEqual([(my_city.id, "s1")], rows)
+
+    def test_save_deletes_rows(self):
+        my_user = User()
+        self.storage.save_to_file()
+        self.storage.delete(my_user)
+        self.storage.save_to_file()
+        self.assertEqual([], self.rows("SELECT id FROM User"))
+
+    def test_reload(self):
+        my_place = Place()
+        my_place.name = "Loft"
+        my_review = Review()
+        self.storage.save_to_file()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objs = self.storage.all()
+        self.assertEqual("Loft", objs["Place." + my_place.id].name)
+        self.assertEqual(my_review.created_at,
+                         objs["Review." + my_review.id].created_at)
+
+    def test_failed_save_is_retried(self):
+        my_place = Place()
+        with sqlite3.connect("test_hbnb.db", timeout=0) as conn:
+            conn.execute("BEGIN EXCLUSIVE")
+            self.storage._DBStorage__conn.execute("PRAGMA busy_timeout = 0")
+            with self.assertRaises(sqlite3.OperationalError):
+                self.storage.save_to_file()
+        self.storage.save_to_file()
+        self.assertEqual([(my_place.id,)], self.rows("SELECT id FROM Place"))
+
+    def test_table_of_new_class(self):
+        class Booking(BaseModel):
+            pass
+
+        try:
+            my_booking = Booking()
+            self.storage.save_to_file()
+            self.assertEqual([(my_booking.id,)],
+                             self.rows("SELECT id FROM Booking"))
+            FileStorage._FileStorage__objects = {}
+            self.storage.reload()
+            self.assertEqual(list(self.storage.all(Booking)),
+                             ["Booking." + my_booking.id])
+        finally:
+            del BaseModel.registry["Booking"]
+
+    def test_save_of_evicted_objects(self):
+        FileStorage._cache_size = 5
+        try:
+            places = [Place() for _ in range(30)]
+            self.storage.save_to_file()
+            self.assertLessEqual(self.storage.cache_stats()["size"], 5)
+        finally:
+            FileStorage._cache_size = 0
+            disk = FileStorage._FileStorage__disk
+            if disk is not None:
+                disk.close()
+                FileStorage._FileStorage__disk = None
+            for path in glob.glob(FileStorage._cache_path + "*"):
+                os.remove(path)
+        self.assertEqual({place.id for place in places},
+                         {obj_id for (obj_id,) in
+                          self.rows("SELECT id FROM Place")})
+
+    def test_ignores_shards(self):
+        FileStorage._sharded = True
+        try:
+            with open(FileStorage._shard_path.format("Place"), "w") as f:
+                f.write('{"Place.1": {"id": "1", "__class__": "Place", '
+                        '"created_at": "2024-05-19T21:10:39.091088", '
+                        '"updated_at": "2024-05-19T21:10:39.091088"}}')
+            self.assertEqual(self.storage.count(Place), 0)
+            self.assertEqual(self.storage.all(), {})
+            my_user = User()
+            self.storage.save_to_file()
+        finally:
+            FileStorage._sharded = False
+            os.remove(FileStorage._shard_path.format("Place"))
+        self.assertFalse(os.path.exists(FileStorage._shard_path.format("User")))
+        self.assertEqual([(my_user.id,)], self.rows("SELECT id FROM User"))
+
+    def test_reload_with_arg(self):
+        with self.assertRaises(TypeError):
+            self.storage.reload(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
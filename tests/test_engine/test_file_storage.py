@@ -2,11 +2,16 @@
 """
 Module for FileStorage unittest
 """
+import contextlib
+import io
 import os
+import glob
 import json
+import time
 import models
 import unittest
 from models.base_model import BaseModel
+from models.engine import codec, file_storage
 from models.engine.file_storage import FileStorage
 from models.user import User
 from models.state import State
@@ -97,6 +102,142 @@ class TestFileStorageMethods(unittest.TestCase):
         self.assertIn("Review." + my_review.id, models.storage.get_all().keys())
         self.assertIn(my_review, models.storage.get_all().values())
 
+    def test_all_with_class(self):
+        my_user = User()
+        my_city = City()
+        self.assertEqual({"User." + my_user.id: my_user},
+                         models.storage.all(User))
+        self.assertEqual({"City." + my_city.id: my_city},
+                         models.storage.all("City"))
+        self.assertEqual({}, models.storage.all(Review))
+
+    def test_count(self):
+        User()
+        User()
+        State()
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("State"))
+        self.assertEqual(0, models.storage.count(Place))
+        self.assertEqual(3, models.storage.count())
+
+    def test_delete_updates_class_index(self):
+        my_user = User()
+        models.storage.delete(my_user)
+        self.assertEqual(0, models.storage.count(User))
+        self.assertNotIn("User." + my_user.id, models.storage.all())
+
+    def test_class_index_follows_replaced_objects(self):
+        User()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count(User))
+
+    def test_lookup(self):
+        my_state = State()
+        my_city = City()
+        my_city.state_id = my_state.id
+        other_city = City()
+        self.assertEqual({my_city.id},
+                         models.storage.lookup(City, "state_id", my_state.id))
+        other_city.state_id = my_state.id
+        self.assertEqual({my_city.id, other_city.id},
+                         models.storage.lookup(City, "state_id", my_state.id))
+        models.storage.delete(my_city)
+        self.assertEqual({other_city.id},
+                         models.storage.lookup(City, "state_id", my_state.id))
+
+    def test_lookup_attribute_without_index(self):
+        my_city = City()
+        my_city.name = "Lagos"
+        self.assertEqual({my_city.id},
+                         models.storage.lookup(City, "name", "Lagos"))
+
+    def test_range(self):
+        cheap, mid, dear = Place(), Place(), Place()
+        cheap.price_by_night = 40
+        mid.price_by_night = 90
+        dear.price_by_night = 300
+        self.assertEqual([cheap, mid],
+                         models.storage.range(Place, "price_by_night", 0, 100))
+        mid.price_by_night = 500
+        self.assertEqual([dear, mid],
+                         models.storage.range(Place, "price_by_night", 100))
+        models.storage.delete(dear)
+        self.assertEqual([mid],
+                         models.storage.range(Place, "price_by_night", 100))
+
+    def test_range_attribute_without_index(self):
+        small, big = Place(), Place()
+        small.latitude = 1.5
+        big.latitude = 9.5
+        self.assertEqual([small, big],
+                         models.storage.range(Place, "latitude", 0, 10))
+
+    def test_near_and_within(self):
+        lagos, abuja, accra = Place(), Place(), Place()
+        lagos.latitude, lagos.longitude = 6.52, 3.38
+        abuja.latitude, abuja.longitude = 9.07, 7.49
+        accra.latitude, accra.longitude = 5.60, -0.19
+        self.assertEqual([lagos, accra], models.storage.near(6.4, 3.4, k=2))
+        self.assertEqual([abuja], models.storage.within(8, 7, 10, 8))
+        abuja.latitude = 6.5
+        self.assertEqual([], models.storage.within(8, 7, 10, 8))
+        models.storage.delete(lagos)
+        self.assertEqual([accra, abuja], models.storage.near(6.4, 3.4, k=2))
+
+    def test_search(self):
+        my_place = Place()
+        my_place.name = "Beach house"
+        my_review = Review()
+        my_review.text = "Lovely beach, lovely host"
+        self.assertEqual([my_place, my_review], models.storage.search("beach"))
+        self.assertEqual([my_review], models.storage.search("beach", Review))
+        self.assertEqual([my_review, my_place],
+                         models.storage.search("lovely house", mode="or"))
+        my_place.name = "Loft"
+        self.assertEqual([], models.storage.search("beach", "Place"))
+
+    def make_places(self):
+        places = []
+        for city_id, price, guests in (("c1", 50, 2), ("c1", 120, 4),
+                                       ("c2", 80, 2), ("c2", 200, 6)):
+            my_place = Place()
+            my_place.city_id = city_id
+            my_place.price_by_night = price
+            my_place.max_guest = guests
+            places.append(my_place)
+        return places
+
+    def test_find(self):
+        p1, p2, p3, p4 = self.make_places()
+        self.assertEqual({p1, p2}, set(models.storage.find(Place, city_id="c1")))
+        self.assertEqual({p2}, set(models.storage.find(
+            Place, city_id="c1", price_by_night__gt=50)))
+        self.assertEqual({p1, p3}, set(models.storage.find(
+            Place, price_by_night__gte=50, price_by_night__lt=120)))
+        self.assertEqual({p3}, set(models.storage.find(
+            Place, max_guest=2, name="", city_id="c2")))
+        self.assertEqual([], models.storage.find(
+            Place, price_by_night__gte=300, price_by_night__lte=100))
+
+    def test_find_without_index(self):
+        p1, p2, p3, p4 = self.make_places()
+        p4.name = "Villa"
+        self.assertEqual([p4], models.storage.find(Place, name="Villa"))
+
+    def test_find_unknown_operator(self):
+        with self.assertRaises(ValueError):
+            models.storage.find(Place, price_by_night__in=[1, 2])
+
+    def test_explain(self):
+        self.make_places()
+        steps = models.storage.explain(Place, city_id="c1",
+                                       price_by_night__lte=60)
+        self.assertTrue(steps[0].startswith("range index price_by_night"))
+        self.assertTrue(steps[1].startswith("intersect hash index city_id"))
+        self.assertTrue(steps[-1].endswith("-> 1 objects"))
+        steps = models.storage.explain(Place, name="Villa")
+        self.assertTrue(steps[0].startswith("scan Place"))
+
     def test_add_with_args(self):
         with self.assertRaises(TypeError):
             models.storage.add(BaseModel(), 1)
@@ -132,6 +273,25 @@ class TestFileStorageMethods(unittest.TestCase):
             self.assertIn("Amenity." + my_amenity.id, save_text)
             self.assertIn("Review." + my_review.id, save_text)
 
+    def test_setattr_marks_object_dirty(self):
+        my_city = City()
+        models.storage.save_to_file()
+        dirty = FileStorage._FileStorage__dirty
+        self.assertNotIn("City." + my_city.id, dirty)
+        my_city.name = "Lagos"
+        self.assertIn("City." + my_city.id, dirty)
+
+    def test_save_to_file_reencodes_dirty_objects(self):
+        my_city = City()
+        my_user = User()
+        models.storage.save_to_file()
+        my_city.name = "Lagos"
+        models.storage.save_to_file()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual(my_city.to_dict(), saved["City." + my_city.id])
+        self.assertEqual(my_user.to_dict(), saved["User." + my_user.id])
+
     def test_save_to_file_with_arg(self):
         with self.assertRaises(TypeError):
             models.storage.save_to_file(None)
@@ -162,11 +322,854 @@ class TestFileStorageMethods(unittest.TestCase):
         self.assertIn("Amenity." + my_amenity.id, objs)
         self.assertIn("Review." + my_review.id, objs)
 
+    def test_reload_streaming(self):
+        my_user = User()
+        my_user.first_name = "Ada"
+        my_place = Place()
+        models.storage.save_to_file()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._streaming = True
+        try:
+            models.storage.reload()
+        finally:
+            FileStorage._streaming = False
+        objs = FileStorage._FileStorage__objects
+        self.assertEqual("Ada", objs["User." + my_user.id].first_name)
+        self.assertEqual(my_place.created_at,
+                         objs["Place." + my_place.id].created_at)
+
+    def test_iter_items_across_chunks(self):
+        data = {"User.1": {"id": "1", "n": 12345}, "City.2": {"id": "2"}}
+        with open("file.json", "w") as f:
+            json.dump(data, f, indent=2)
+        with open("file.json", "r") as f:
+            items = list(codec.iter_items(f, chunk_size=3))
+        self.assertEqual(list(data.items()), items)
+
     def test_reload_with_arg(self):
         with self.assertRaises(TypeError):
             models.storage.reload(None)
 
 
+class TestFileStorageJournal(unittest.TestCase):
+    """
+    Unittests for the journaled save mode of the FileStorage class.
+    """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except FileNotFoundError:
+            pass
+        FileStorage._journaling = True
+
+    def tearDown(self):
+        FileStorage._journaling = False
+        for path in ("file.json", FileStorage._journal_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except FileNotFoundError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def journal_records(self):
+        with open(FileStorage._journal_path, "r") as f:
+            return [json.loads(line) for line in f]
+
+    def test_save_appends_changed_objects_only(self):
+        models.storage.save_to_file()
+        my_user = User()
+        my_user.save()
+        records = self.journal_records()
+        self.assertEqual(1, len(records))
+        self.assertEqual("set", records[0]["op"])
+        self.assertEqual("User." + my_user.id, records[0]["key"])
+        self.assertFalse(os.path.isfile("file.json"))
+
+    def test_delete_is_journaled(self):
+        my_state = State()
+        my_state.save()
+        models.storage.delete(my_state)
+        models.storage.save_to_file()
+        records = self.journal_records()
+        self.assertEqual({"op": "delete", "key": "State." + my_state.id},
+                         records[-1])
+
+    def test_reload_replays_journal(self):
+        my_place = Place()
+        my_place.name = "Loft"
+        my_place.save()
+        my_city = City()
+        my_city.save()
+        models.storage.delete(my_city)
+        models.storage.save_to_file()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = FileStorage._FileStorage__objects
+        self.assertEqual("Loft", objs["Place." + my_place.id].name)
+        self.assertNotIn("City." + my_city.id, objs)
+
+    def test_reload_drops_torn_record(self):
+        my_review = Review()
+        my_review.save()
+        with open(FileStorage._journal_path, "a") as f:
+            f.write('{"op": "set", "key": "Rev')
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("Review." + my_review.id,
+                      FileStorage._FileStorage__objects)
+        self.assertEqual(1, len(self.journal_records()))
+
+    def test_compact(self):
+        my_amenity = Amenity()
+        my_amenity.save()
+        models.storage.compact()
+        self.assertFalse(os.path.isfile(FileStorage._journal_path))
+        with open("file.json", "r") as f:
+            self.assertIn("Amenity." + my_amenity.id, f.read())
+
+
+class TestFileStorageSharded(unittest.TestCase):
+    """
+    Unittests for the per-class sharded layout of the FileStorage class.
+    """
+
+    def setUp(self):
+        FileStorage._sharded = True
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__loaded = set()
+
+    def tearDown(self):
+        FileStorage._sharded = False
+        for path in glob.glob(FileStorage._shard_path.format("*")):
+            os.remove(path)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__loaded = set()
+
+    def test_save_writes_one_file_per_class(self):
+        my_place = Place()
+        my_review = Review()
+        models.storage.save_to_file()
+        with open(FileStorage._shard_path.format("Place"), "r") as f:
+            self.assertIn("Place." + my_place.id, json.load(f))
+        with open(FileStorage._shard_path.format("Review"), "r") as f:
+            self.assertIn("Review." + my_review.id, json.load(f))
+
+    def test_save_rewrites_changed_shards_only(self):
+        my_place = Place()
+        Review()
+        models.storage.save_to_file()
+        os.remove(FileStorage._shard_path.format("Review"))
+        my_place.name = "Loft"
+        models.storage.save_to_file()
+        self.assertFalse(os.path.isfile(FileStorage._shard_path.format("Review")))
+
+    def test_shards_load_on_first_access(self):
+        my_place = Place()
+        my_review = Review()
+        models.storage.save_to_file()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("Place." + my_place.id, models.storage.all(Place))
+        self.assertNotIn("Review." + my_review.id,
+                         FileStorage._FileStorage__objects)
+        self.assertIn("Review." + my_review.id, models.storage.all())
+
+    def test_save_keeps_unloaded_objects(self):
+        my_place = Place()
+        models.storage.save_to_file()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        new_place = Place()
+        models.storage.save_to_file()
+        with open(FileStorage._shard_path.format("Place"), "r") as f:
+            saved = json.load(f)
+        self.assertIn("Place." + my_place.id, saved)
+        self.assertIn("Place." + new_place.id, saved)
+
+    def test_rollback_keeps_shard_loaded_in_transaction(self):
+        my_place = Place()
+        models.storage.save_to_file()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        models.storage.begin()
+        self.assertEqual(models.storage.count("Place"), 1)
+        models.storage.rollback()
+        User().save()
+        self.assertEqual(models.storage.count("Place"), 1)
+        with open(FileStorage._shard_path.format("Place"), "r") as f:
+            self.assertIn("Place." + my_place.id, json.load(f))
+
+
+class TestFileStorageWriteBehind(unittest.TestCase):
+    """
+    Unittests for the write-behind flushing of the FileStorage class.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        models.storage.flush()
+        os.remove(FileStorage._file_path)
+
+    def tearDown(self):
+        models.storage.flush()
+        FileStorage._FileStorage__pending = 0
+        FileStorage._flush_interval = 0
+        FileStorage._flush_after = 1000
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove(FileStorage._file_path)
+        except IOError:
+            pass
+
+    def test_save_is_deferred_until_flush(self):
+        FileStorage._flush_interval = 60
+        my_user = User()
+        models.storage.save_to_file()
+        self.assertFalse(os.path.isfile(FileStorage._file_path))
+        models.storage.flush()
+        with open(FileStorage._file_path, "r") as f:
+            self.assertIn("User." + my_user.id, json.load(f))
+
+    def test_flush_after_threshold(self):
+        FileStorage._flush_interval = 60
+        FileStorage._flush_after = 3
+        users = [User() for _ in range(3)]
+        for _ in users:
+            models.storage.save_to_file()
+        for _ in range(200):
+            if os.path.isfile(FileStorage._file_path):
+                break
+            time.sleep(0.01)
+        with models.storage._lock(), open(FileStorage._file_path) as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_flush_after_interval(self):
+        FileStorage._flush_interval = 0.05
+        my_user = User()
+        models.storage.save_to_file()
+        for _ in range(200):
+            if os.path.isfile(FileStorage._file_path):
+                break
+            time.sleep(0.01)
+        with models.storage._lock(), open(FileStorage._file_path) as f:
+            self.assertIn("User." + my_user.id, json.load(f))
+
+    def test_failed_flush_is_retried(self):
+        FileStorage._flush_interval = 0.02
+        my_user = User()
+        FileStorage._durability = "bad"
+        stderr = io.StringIO()
+        try:
+            with contextlib.redirect_stderr(stderr):
+                models.storage.save_to_file()
+                for _ in range(200):
+                    if "flush failed" in stderr.getvalue():
+                        break
+                    time.sleep(0.01)
+        finally:
+            FileStorage._durability = "none"
+        self.assertIn("flush failed", stderr.getvalue())
+        self.assertTrue(FileStorage._FileStorage__flusher.is_alive())
+        my_user.first_name = "saved"
+        self.assertTrue(self.wait_for_first_name(my_user, "saved"))
+
+    def wait_for_first_name(self, user, name):
+        for _ in range(200):
+            if os.path.isfile(FileStorage._file_path):
+                with models.storage._lock(), \
+                        open(FileStorage._file_path) as f:
+                    value = json.load(f).get(f"User.{user.id}", {})
+                if value.get("first_name") == name:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def test_transaction_is_not_flushed(self):
+        FileStorage._flush_interval = 0.02
+        my_user = User()
+        my_user.first_name = "saved"
+        models.storage.save_to_file()
+        models.storage.begin()
+        self.assertTrue(self.wait_for_first_name(my_user, "saved"))
+        my_user.first_name = "uncommitted"
+        models.storage.save_to_file()
+        time.sleep(0.1)
+        models.storage.flush()
+        self.assertTrue(self.wait_for_first_name(my_user, "saved"))
+        models.storage.rollback()
+        self.assertTrue(self.wait_for_first_name(my_user, "saved"))
+
+    def test_commit_is_flushed(self):
+        FileStorage._flush_interval = 0.02
+        my_user = User()
+        with models.storage.transaction():
+            my_user.first_name = "committed"
+            models.storage.save_to_file()
+        self.assertTrue(self.wait_for_first_name(my_user, "committed"))
+
+
+class TestFileStorageDurability(unittest.TestCase):
+    """
+    Unittests for the atomic saves and corrupt file handling
+    of the FileStorage class.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        FileStorage._durability = "none"
+        FileStorage._FileStorage__objects = {}
+        for path in (FileStorage._file_path,
+                     FileStorage._file_path + ".tmp",
+                     FileStorage._file_path + ".corrupt"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def test_save_leaves_no_temporary_file(self):
+        for level in ("none", "file", "dir"):
+            FileStorage._durability = level
+            my_user = User()
+            models.storage.save_to_file()
+            self.assertFalse(os.path.exists(FileStorage._file_path + ".tmp"))
+            with open(FileStorage._file_path, "r") as f:
+                self.assertIn("User." + my_user.id, json.load(f))
+
+    def test_invalid_durability(self):
+        FileStorage._durability = "always"
+        User()
+        with self.assertRaises(ValueError):
+            models.storage.save_to_file()
+
+    def test_failed_write_keeps_previous_file(self):
+        my_user = User()
+        models.storage.save_to_file()
+        with self.assertRaises(TypeError):
+            file_storage._write_atomic(FileStorage._file_path, None)
+        with open(FileStorage._file_path, "r") as f:
+            self.assertIn("User." + my_user.id, json.load(f))
+
+    def test_reload_moves_corrupt_file_aside(self):
+        with open(FileStorage._file_path, "w") as f:
+            f.write('{"User.1": {"id": "1", "__class__": "Us')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            models.storage.reload()
+        self.assertIn(".corrupt", stderr.getvalue())
+        self.assertFalse(os.path.exists(FileStorage._file_path))
+        self.assertTrue(os.path.isfile(FileStorage._file_path + ".corrupt"))
+
+
+class TestFileStorageTransaction(unittest.TestCase):
+    """
+    Unittests for the transactions of the FileStorage class.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        models.storage.flush()
+        os.remove(FileStorage._file_path)
+
+    def tearDown(self):
+        while FileStorage._FileStorage__savepoints:
+            models.storage.rollback()
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove(FileStorage._file_path)
+        except IOError:
+            pass
+
+    def test_saves_are_deferred_to_commit(self):
+        with models.storage.transaction():
+            users = [User() for _ in range(3)]
+            for user in users:
+                user.save()
+            self.assertFalse(os.path.isfile(FileStorage._file_path))
+        with open(FileStorage._file_path, "r") as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_rollback_restores_objects(self):
+        kept = Place()
+        kept.city_id = "c1"
+        kept.name = "Loft"
+        removed = Place()
+        removed.city_id = "c1"
+        models.storage.save()
+        models.storage.begin()
+        kept.name = "Barn"
+        kept.city_id = "c2"
+        kept.price_by_night = 90
+        models.storage.delete(removed)
+        added = Place()
+        added.city_id = "c1"
+        models.storage.rollback()
+        self.assertEqual(kept.name, "Loft")
+        self.assertNotIn("price_by_night", kept.__dict__)
+        self.assertEqual(models.storage.all(Place),
+                         {"Place." + kept.id: kept,
+                          "Place." + removed.id: removed})
+        self.assertEqual(models.storage.lookup(Place, "city_id", "c1"),
+                         {kept.id, removed.id})
+        self.assertEqual(models.storage.lookup(Place, "city_id", "c2"), set())
+        self.assertIsNone(models.storage.get(Place, added.id))
+
+    def test_exception_rolls_back(self):
+        with self.assertRaises(KeyError):
+            with models.storage.transaction():
+                User()
+                raise KeyError
+        self.assertEqual(models.storage.count(User), 0)
+        self.assertFalse(os.path.isfile(FileStorage._file_path))
+
+    def test_nested_rollback(self):
+        models.storage.begin()
+        outer = User()
+        models.storage.begin()
+        outer.first_name = "Betty"
+        inner = User()
+        models.storage.rollback()
+        self.assertNotIn("first_name", outer.__dict__)
+        self.assertIsNone(models.storage.get(User, inner.id))
+        outer.save()
+        self.assertFalse(os.path.isfile(FileStorage._file_path))
+        models.storage.commit()
+        with open(FileStorage._file_path, "r") as f:
+            self.assertEqual(list(json.load(f)), ["User." + outer.id])
+
+    def test_commit_without_begin(self):
+        with self.assertRaises(RuntimeError):
+            models.storage.commit()
+        with self.assertRaises(RuntimeError):
+            models.storage.rollback()
+
+
+class TestFileStorageAddMany(unittest.TestCase):
+    """
+    Unittests for the bulk insertion of the FileStorage class.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove(FileStorage._file_path)
+        except IOError:
+            pass
+
+    def build(self, count):
+        for number in range(count):
+            place = Place()
+            place.city_id = "c1"
+            place.price_by_night = number
+            yield place
+
+    def test_add_many_indexes_and_saves(self):
+        existing = Place()
+        existing.price_by_night = 50
+        self.assertEqual(models.storage.add_many(self.build(100)), 100)
+        self.assertEqual(models.storage.count(Place), 101)
+        self.assertEqual(len(models.storage.lookup(Place, "city_id", "c1")),
+                         100)
+        prices = [place.price_by_night for place in
+                  models.storage.range(Place, "price_by_night", 49, 51)]
+        self.assertEqual(prices, [49, 50, 50, 51])
+        with open(FileStorage._file_path, "r") as f:
+            self.assertEqual(len(json.load(f)), 101)
+
+    def test_add_many_saves_once(self):
+        saves = []
+        original = FileStorage.save_to_file
+        FileStorage.save_to_file = lambda storage: saves.append(storage)
+        try:
+            models.storage.add_many(self.build(10))
+        finally:
+            FileStorage.save_to_file = original
+        self.assertEqual(len(saves), 1)
+
+    def test_add_many_failure_adds_nothing(self):
+        def failing():
+            yield from self.build(3)
+            raise ValueError
+        with self.assertRaises(ValueError):
+            models.storage.add_many(failing())
+        self.assertEqual(models.storage.count(Place), 0)
+
+    def test_add_many_is_rolled_back(self):
+        models.storage.begin()
+        models.storage.add_many(self.build(3))
+        models.storage.rollback()
+        self.assertEqual(models.storage.count(Place), 0)
+
+
+class TestFileStorageParallelReload(unittest.TestCase):
+    """
+    Unittests for the reload of the FileStorage class in worker processes.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._workers = 3
+        FileStorage._parallel_min_size = 0
+
+    def tearDown(self):
+        FileStorage._workers = 0
+        FileStorage._parallel_min_size = 1 << 20
+        FileStorage._FileStorage__objects = {}
+        for path in (FileStorage._file_path,
+                     FileStorage._file_path + ".corrupt"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def test_save_writes_one_object_per_line(self):
+        users = [User() for _ in range(3)]
+        models.storage.save()
+        with open(FileStorage._file_path, "r") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "{")
+        self.assertEqual(lines[-1], "}")
+        self.assertEqual(len(lines), 5)
+        for user, line in zip(users, lines[1:-1]):
+            self.assertTrue(line.startswith(f'"User.{user.id}": '))
+
+    def test_line_ranges_cover_the_file(self):
+        with open(FileStorage._file_path, "w") as f:
+            f.write("0123456789")
+        ranges = file_storage._line_ranges(FileStorage._file_path, 3)
+        self.assertEqual(ranges, [(0, 3), (3, 6), (6, 10)])
+
+    def test_parallel_reload(self):
+        places = []
+        for number in range(50):
+            place = Place()
+            place.city_id = "c1"
+            place.price_by_night = number
+            places.append(place)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertTrue(models.storage._parallel())
+        reloaded = models.storage.all(Place)
+        self.assertEqual(len(reloaded), 50)
+        for place in places:
+            self.assertEqual(reloaded["Place." + place.id].to_dict(),
+                             place.to_dict())
+        self.assertEqual(len(models.storage.lookup(Place, "city_id", "c1")),
+                         50)
+        self.assertEqual(len(models.storage.range(Place, "price_by_night",
+                                                  10, 19)), 10)
+
+    def test_parallel_reload_of_corrupt_file(self):
+        with open(FileStorage._file_path, "w") as f:
+            f.write('{\n"User.1": {"id": "1", "__cl\n}\n')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            models.storage.reload()
+        self.assertEqual(models.storage.all(), {})
+        self.assertTrue(os.path.isfile(FileStorage._file_path + ".corrupt"))
+
+
+class TestFileStorageLazy(unittest.TestCase):
+    """
+    Unittests for the lazy materialization of the FileStorage class.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.users = [User() for _ in range(3)]
+        self.places = [Place() for _ in range(2)]
+        for place in self.places:
+            place.city_id = "c1"
+        models.storage.save()
+        FileStorage._lazy = True
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+    def tearDown(self):
+        FileStorage._lazy = False
+        FileStorage._journaling = False
+        FileStorage._FileStorage__objects = {}
+        for path in (FileStorage._file_path, FileStorage._journal_path):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def materialized(self):
+        return len(FileStorage._FileStorage__objects)
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual(self.materialized(), 0)
+        self.assertEqual(models.storage.count(), 5)
+        self.assertEqual(models.storage.count(User), 3)
+
+    def test_get_builds_one_object(self):
+        user = models.storage.get(User, self.users[1].id)
+        self.assertEqual(user.to_dict(), self.users[1].to_dict())
+        self.assertIs(models.storage.get("User", self.users[1].id), user)
+        self.assertEqual(self.materialized(), 1)
+        self.assertEqual(models.storage.count(User), 3)
+
+    def test_all_builds_one_class(self):
+        self.assertEqual(len(models.storage.all(User)), 3)
+        self.assertEqual(self.materialized(), 3)
+        self.assertEqual(len(models.storage.lookup(Place, "city_id", "c1")), 2)
+        self.assertEqual(len(models.storage.all()), 5)
+
+    def test_untouched_objects_are_saved_as_read(self):
+        with open(FileStorage._file_path, "r") as f:
+            before = f.read()
+        user = models.storage.get(User, self.users[0].id)
+        models.storage.save()
+        self.assertEqual(self.materialized(), 1)
+        with open(FileStorage._file_path, "r") as f:
+            self.assertEqual(sorted(f.read().splitlines()),
+                             sorted(before.splitlines()))
+        user.first_name = "Betty"
+        models.storage.save()
+        FileStorage._lazy = False
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(), 5)
+        self.assertEqual(models.storage.get(User, user.id).first_name, "Betty")
+
+    def test_delete_and_replace(self):
+        models.storage.delete(models.storage.get(User, self.users[0].id))
+        User(**self.users[1].to_dict())
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(User), 2)
+        self.assertIsNone(models.storage.get(User, self.users[0].id))
+
+    def test_journal_delete_of_raw_record(self):
+        FileStorage._journaling = True
+        models.storage.delete(models.storage.get(Place, self.places[0].id))
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(Place), 1)
+        self.assertEqual(self.materialized(), 0)
+
+
+class TestFileStorageCache(unittest.TestCase):
+    """
+    Unittests for the bounded object cache of the FileStorage class.
+    """
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._cache_size = 3
+        FileStorage._FileStorage__cache_stats = dict.fromkeys(
+            ("hits", "misses", "evictions", "writes"), 0)
+        self.users = []
+        for number in range(5):
+            user = User()
+            user.first_name = f"user{number}"
+            self.users.append(user)
+
+    def tearDown(self):
+        FileStorage._cache_size = 0
+        FileStorage._journaling = False
+        FileStorage._FileStorage__objects = {}
+        disk = FileStorage._FileStorage__disk
+        if disk is not None:
+            disk.close()
+            FileStorage._FileStorage__disk = None
+        for path in glob.glob(FileStorage._cache_path + "*") + \
+                [FileStorage._file_path, FileStorage._journal_path]:
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def materialized(self):
+        return len(FileStorage._FileStorage__objects)
+
+    def test_bounded(self):
+        self.assertEqual(self.materialized(), 3)
+        self.assertEqual(models.storage.count(User), 5)
+        stats = models.storage.cache_stats()
+        self.assertEqual(stats["size"], 3)
+        self.assertEqual(stats["capacity"], 3)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["writes"], 2)
+        self.assertTrue(glob.glob(FileStorage._cache_path + "*"))
+
+    def test_get_evicts_least_recently_used(self):
+        self.assertIs(models.storage.get(User, self.users[4].id),
+                      self.users[4])
+        user = models.storage.get(User, self.users[0].id)
+        self.assertIsNot(user, self.users[0])
+        self.assertEqual(user.to_dict(), self.users[0].to_dict())
+        self.assertIs(models.storage.get(User, user.id), user)
+        stats = models.storage.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertEqual(stats["evictions"], 3)
+        objects = FileStorage._FileStorage__objects
+        self.assertNotIn(f"User.{self.users[2].id}", objects)
+        self.assertIn(f"User.{self.users[4].id}", objects)
+
+    def test_clean_objects_are_not_written_again(self):
+        for user in self.users[:2]:
+            models.storage.get(User, user.id)
+        self.assertEqual(models.storage.cache_stats()["writes"], 4)
+        user = models.storage.get(User, self.users[0].id)
+        user.first_name = "Betty"
+        for user in self.users[2:]:
+            models.storage.get(User, user.id)
+        # only the first eviction of users[4] and the changed users[0]
+        self.assertEqual(models.storage.cache_stats()["writes"], 6)
+        self.assertEqual(
+            models.storage.get(User, self.users[0].id).first_name, "Betty")
+
+    def test_all_and_queries(self):
+        objects = models.storage.all()
+        self.assertEqual(len(objects), 5)
+        self.assertEqual(self.materialized(), 3)
+        self.assertEqual(len(models.storage.all(User)), 5)
+        self.assertEqual(models.storage.lookup(User, "first_name", "user0"),
+                         {self.users[0].id})
+
+    def test_queries_evict(self):
+        self.assertEqual(len(models.storage.find(User, first_name="user0")), 1)
+        self.assertEqual(self.materialized(), 3)
+        self.assertEqual(models.storage.range(User, "first_name"), [])
+        self.assertEqual(self.materialized(), 3)
+        self.assertEqual(models.storage.search("user0"), [])
+        self.assertEqual(self.materialized(), 3)
+
+    def test_binary_save_keeps_cache(self):
+        FileStorage._codec = "binary"
+        try:
+            evictions = models.storage.cache_stats()["evictions"]
+            models.storage.save()
+            self.assertEqual(self.materialized(), 3)
+            self.assertEqual(models.storage.cache_stats()["evictions"],
+                             evictions)
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+        finally:
+            FileStorage._codec = "json"
+        self.assertEqual(models.storage.count(User), 5)
+        self.assertEqual(models.storage.get(User, self.users[0].id).first_name,
+                         "user0")
+
+    def test_save_and_reload(self):
+        models.storage.delete(models.storage.get(User, self.users[0].id))
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(self.materialized(), 0)
+        self.assertEqual(models.storage.count(User), 4)
+        self.assertIsNone(models.storage.get(User, self.users[0].id))
+        for user in self.users[1:]:
+            self.assertEqual(models.storage.get(User, user.id).to_dict(),
+                             user.to_dict())
+        self.assertEqual(self.materialized(), 3)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(User), 4)
+
+    def test_journal_of_evicted_object(self):
+        FileStorage._journaling = True
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(User), 5)
+        self.assertEqual(models.storage.get(User, self.users[0].id).first_name,
+                         "user0")
+
+    def test_journal_delete_of_evicted_object(self):
+        FileStorage._journaling = True
+        models.storage.save()
+        models.storage.delete(self.users[0])
+        models.storage.save()
+        with open(FileStorage._journal_path, "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertIn({"op": "delete", "key": f"User.{self.users[0].id}"},
+                      records)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count(User), 4)
+        self.assertIsNone(models.storage.get(User, self.users[0].id))
+
+    def test_ndjson_delete_of_evicted_object(self):
+        FileStorage._codec = "ndjson"
+        try:
+            models.storage.save()
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+            evicted = [user for user in self.users if f"User.{user.id}"
+                       not in FileStorage._FileStorage__objects][0]
+            models.storage.delete(evicted)
+            models.storage.save()
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+        finally:
+            FileStorage._codec = "json"
+        self.assertEqual(models.storage.count(User), 4)
+        self.assertIsNone(models.storage.get(User, evicted.id))
+
+    def change_evicted_object(self):
+        models.storage.save()
+        models.storage.get(User, self.users[0].id).first_name = "Betty"
+        for user in self.users[1:]:
+            models.storage.get(User, user.id)
+        self.assertNotIn(f"User.{self.users[0].id}",
+                         FileStorage._FileStorage__objects)
+        models.storage.get(User, self.users[0].id)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.get(User, self.users[0].id).first_name,
+                         "Betty")
+
+    def test_journal_of_change_to_evicted_object(self):
+        FileStorage._journaling = True
+        self.change_evicted_object()
+
+    def test_ndjson_of_change_to_evicted_object(self):
+        FileStorage._codec = "ndjson"
+        try:
+            self.change_evicted_object()
+        finally:
+            FileStorage._codec = "json"
+
+    def test_rollback_of_delete_of_evicted_object(self):
+        with models.storage.transaction() as storage:
+            storage.delete(self.users[0])
+            storage.rollback()
+            storage.begin()
+        self.assertEqual(models.storage.count(User), 5)
+        self.assertEqual(models.storage.get(User, self.users[0].id).first_name,
+                         "user0")
+
+    def test_rollback_restores_evicted_changes(self):
+        models.storage.save()
+        with self.assertRaises(ValueError):
+            with models.storage.transaction():
+                for user in self.users:
+                    models.storage.get(User, user.id).first_name = "Betty"
+                self.assertEqual(self.materialized(), 5)
+                raise ValueError
+        self.assertEqual(self.materialized(), 3)
+        for user in self.users:
+            self.assertNotEqual(
+                models.storage.get(User, user.id).first_name, "Betty")
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,248 @@
+#!/usr/bin/python3
+"""
+Module for indexes unittest
+"""
+import unittest
+from models.engine.indexes import GridIndex, HashIndex, RangeIndex, SortedList
+from models.engine.indexes import TextIndex, distance_km, tokenize
+
+
+class Record:
+    """Minimal object with an id for the indexes"""
+
+    def __init__(self, obj_id, **kwargs):
+        self.id = obj_id
+        self.__dict__.update(kwargs)
+
+
+class TestHashIndex(unittest.TestCase):
+    """
+    Unittests for testing the HashIndex class.
+    """
+
+    def test_lookup(self):
+        index = HashIndex("state_id")
+        index.update(Record("1", state_id="s1"))
+        index.update(Record("2", state_id="s1"))
+        index.update(Record("3", state_id="s2"))
+        self.assertEqual({"1", "2"}, index.lookup("s1"))
+        self.assertEqual({"3"}, index.lookup("s2"))
+        self.assertEqual(set(), index.lookup("s3"))
+        self.assertEqual(3, len(index))
+
+    def test_update_moves_object(self):
+        index = HashIndex("state_id")
+        record = Record("1", state_id="s1")
+        index.update(record)
+        record.state_id = "s2"
+        index.update(record)
+        self.assertEqual(set(), index.lookup("s1"))
+        self.assertEqual({"1"}, index.lookup("s2"))
+
+    def test_remove(self):
+        index = HashIndex("state_id")
+        index.update(Record("1", state_id="s1"))
+        self.assertEqual("s1", index.remove("1"))
+        self.assertEqual(set(), index.lookup("s1"))
+        self.assertEqual(0, len(index))
+
+    def test_unhashable_values_are_skipped(self):
+        index = HashIndex("state_id")
+        record = Record("1", state_id="s1")
+        index.update(record)
+        record.state_id = ["s1"]
+        index.update(record)
+        self.assertEqual(set(), index.lookup("s1"))
+        self.assertEqual(0, len(index))
+
+    def test_missing_attribute_is_None(self):
+        index = HashIndex("state_id")
+        index.update(Record("1"))
+        self.assertEqual({"1"}, index.lookup(None))
+
+    def test_cache_dropped_when_ids_change(self):
+        index = HashIndex("state_id")
+        record = Record("1", state_id="s1")
+        index.update(record)
+        index.cache["s1"] = "cities of s1"
+        index.cache["s2"] = "cities of s2"
+        index.update(record)
+        self.assertIn("s1", index.cache)
+        record.state_id = "s2"
+        index.update(record)
+        self.assertEqual({}, index.cache)
+
+
+
+class TestSortedList(unittest.TestCase):
+    """
+    Unittests for testing the SortedList class.
+    """
+
+    def setUp(self):
+        self.block_size = SortedList.block_size
+        SortedList.block_size = 2
+
+    def tearDown(self):
+        SortedList.block_size = self.block_size
+
+    def test_add_keeps_order(self):
+        items = SortedList([5, 1])
+        for item in (3, 9, 0, 4, 7, 2):
+            items.add(item)
+        self.assertEqual([0, 1, 2, 3, 4, 5, 7, 9], list(items.irange(0, 10)))
+        self.assertEqual(8, len(items))
+
+    def test_remove(self):
+        items = SortedList(range(10))
+        for item in (0, 5, 9, 6):
+            items.remove(item)
+        self.assertEqual([1, 2, 3, 4, 7, 8], list(items.irange(0, 10)))
+
+    def test_irange_and_count(self):
+        items = SortedList(range(0, 20, 2))
+        self.assertEqual([4, 6, 8], list(items.irange(3, 10)))
+        self.assertEqual(3, items.count(3, 10))
+        self.assertEqual(0, items.count(30, 40))
+        self.assertEqual(10, items.count(-1, 40))
+
+
+class TestRangeIndex(unittest.TestCase):
+    """
+    Unittests for testing the RangeIndex class.
+    """
+
+    def test_range(self):
+        index = RangeIndex("price_by_night")
+        for obj_id, price in (("1", 80), ("2", 120), ("3", 100), ("4", 100)):
+            index.update(Record(obj_id, price_by_night=price))
+        self.assertEqual(["3", "4", "2"], index.range(100, 120))
+        self.assertEqual(["1", "3", "4"], index.range(high=100))
+        self.assertEqual(["2"], index.range(low=101))
+        self.assertEqual(3, index.count(100, 120))
+
+    def test_update_moves_object(self):
+        index = RangeIndex("price_by_night")
+        record = Record("1", price_by_night=80)
+        index.update(record)
+        record.price_by_night = 150
+        index.update(record)
+        self.assertEqual([], index.range(0, 100))
+        self.assertEqual(["1"], index.range(100, 200))
+
+    def test_non_numbers_are_skipped(self):
+        index = RangeIndex("price_by_night")
+        index.update(Record("1", price_by_night="80"))
+        index.update(Record("2", price_by_night=True))
+        index.update(Record("3"))
+        self.assertEqual(0, len(index))
+
+    def test_rebuild(self):
+        index = RangeIndex("max_guest")
+        index.update(Record("0", max_guest=1))
+        index.rebuild([Record("1", max_guest=4), Record("2", max_guest=2)])
+        self.assertEqual(["2", "1"], index.range())
+        self.assertIsNone(index.remove("0"))
+
+
+
+class TestGridIndex(unittest.TestCase):
+    """
+    Unittests for testing the GridIndex class.
+    """
+
+    def setUp(self):
+        self.index = GridIndex("latitude", "longitude")
+        for obj_id, lat, lon in (("lagos", 6.52, 3.38), ("ibadan", 7.38, 3.95),
+                                 ("abuja", 9.07, 7.49), ("accra", 5.60, -0.19),
+                                 ("fiji", -17.8, 179.9), ("samoa", -13.8, -172.1)):
+            self.index.update(Record(obj_id, latitude=lat, longitude=lon))
+
+    def test_distance_km(self):
+        self.assertAlmostEqual(111.2, distance_km(0, 0, 1, 0), places=1)
+        self.assertEqual(0, distance_km(6.5, 3.4, 6.5, 3.4))
+
+    def test_near(self):
+        found = self.index.near(6.45, 3.40, 3)
+        self.assertEqual(["lagos", "ibadan", "accra"],
+                         [obj_id for _, obj_id in found])
+        self.assertLess(found[0][0], found[1][0])
+
+    def test_near_across_antimeridian(self):
+        found = self.index.near(-17.0, -179.9, 1)
+        self.assertEqual("fiji", found[0][1])
+
+    def test_near_more_than_indexed(self):
+        self.assertEqual(6, len(self.index.near(0, 0, 20)))
+
+    def test_near_pole_matches_scan(self):
+        points = {f"p{number}": ((number * 37) % 130 - 60,
+                                 (number * 71) % 360 - 180)
+                  for number in range(500)}
+        index = GridIndex("latitude", "longitude")
+        for obj_id, (lat, lon) in points.items():
+            index.update(Record(obj_id, latitude=lat, longitude=lon))
+        for lat, lon, k in ((88, 0, 20), (-89, 170, 5), (0, 0, 500)):
+            expected = sorted((distance_km(lat, lon, *point), obj_id)
+                              for obj_id, point in points.items())[:k]
+            self.assertEqual(expected, index.near(lat, lon, k))
+
+    def test_within(self):
+        self.assertEqual({"lagos", "ibadan"},
+                         set(self.index.within(6, 3, 8, 4)))
+        self.assertEqual({"fiji", "samoa"},
+                         set(self.index.within(-20, 170, -10, -170)))
+
+    def test_update_moves_object(self):
+        moved = Record("lagos", latitude=9.0, longitude=7.5)
+        self.index.update(moved)
+        self.assertEqual([], self.index.within(6, 3, 7, 4))
+        self.assertIn("lagos", self.index.within(8, 7, 10, 8))
+
+    def test_remove(self):
+        self.assertEqual((6.52, 3.38), self.index.remove("lagos"))
+        self.assertEqual(5, len(self.index))
+
+
+
+class TestTextIndex(unittest.TestCase):
+    """
+    Unittests for testing the TextIndex class.
+    """
+
+    def setUp(self):
+        self.index = TextIndex("name", "description")
+        self.index.update(Record("1", name="Beach house",
+                                 description="Beach access, sea view"))
+        self.index.update(Record("2", name="City loft",
+                                 description="Close to the beach"))
+        self.index.update(Record("3", name="Farm", description=""))
+
+    def test_tokenize(self):
+        self.assertEqual(["sea", "view", "n0"], tokenize("Sea-view, N0!"))
+
+    def test_search_and_ranks_by_frequency(self):
+        self.assertEqual([(2, "1"), (1, "2")], self.index.search("beach"))
+        self.assertEqual([(2, "2")], self.index.search("beach LOFT"))
+        self.assertEqual([], self.index.search("beach farm"))
+
+    def test_search_or(self):
+        self.assertEqual([(2, "1"), (1, "2"), (1, "3")],
+                         self.index.search("beach farm", mode="or"))
+
+    def test_update_and_remove(self):
+        self.index.update(Record("3", name="Beach farm", description=""))
+        self.assertEqual(["1", "2", "3"],
+                         [obj_id for _, obj_id in self.index.search("beach")])
+        self.index.remove("1")
+        self.assertEqual(["2", "3"],
+                         [obj_id for _, obj_id in self.index.search("beach")])
+        self.assertEqual(2, len(self.index))
+
+    def test_search_bad_mode(self):
+        with self.assertRaises(ValueError):
+            self.index.search("beach", mode="xor")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ Unittest classes:
 """
 import os
 import models
+import json
 import unittest
 from datetime import datetime
 from time import sleep
@@ -47,6 +48,74 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(bam_dict['created_at'], bam.created_at.isoformat())
         self.assertEqual(bam_dict["updated_at"], bam.created_at.isoformat())
 
+    def test_from_dict(self):
+        """
+        Test for from_dict class method
+        """
+        bam = BaseModel()
+        bam.name = "My model"
+        copy = BaseModel.from_dict(bam.to_dict())
+        self.assertIsNot(copy, bam)
+        self.assertEqual(copy.__dict__, bam.__dict__)
+        self.assertIsInstance(copy.created_at, datetime)
+        copy = BaseModel.from_dict({"id": "0", "__class__": "BaseModel",
+                                    "created_at": "2017-09-28T21:03:54",
+                                    "updated_at": "2017-09-28T21:03:54.052"})
+        self.assertEqual(copy.created_at, datetime(2017, 9, 28, 21, 3, 54))
+        self.assertEqual(copy.updated_at.microsecond, 52000)
+        self.assertIsNone(models.storage.get(BaseModel, "0"))
+
+    def test_from_dict_interns_names(self):
+        """
+        Test that from_dict shares the attribute names of its instances
+        """
+        first, second = (BaseModel.from_dict(json.loads(
+            '{"id": "%d", "nick_name": "a"}' % number)) for number in (1, 2))
+        names = [name for obj in (first, second) for name in obj.__dict__
+                 if name == "nick_name"]
+        self.assertIs(names[0], names[1])
+
+    def test_init_from_kwargs(self):
+        """
+        Test for init from a dictionary
+        """
+        bam = BaseModel()
+        copy = BaseModel(**bam.to_dict())
+        self.assertEqual(copy.__dict__, bam.__dict__)
+        self.assertNotIn("__class__", copy.__dict__)
+
+    def test_registry(self):
+        """
+        Test for the registry of classes
+        """
+        from models.place import Place
+        self.assertIs(BaseModel.registry["BaseModel"], BaseModel)
+        self.assertIs(BaseModel.registry["Place"], Place)
+
+        class Boat(BaseModel):
+            pass
+        self.assertIs(BaseModel.registry.pop("Boat"), Boat)
+
+    def test_coerce(self):
+        """
+        Test for the conversion of typed values
+        """
+        from models.place import Place
+        self.assertEqual(Place.coerce("number_rooms", "3"), 3)
+        self.assertEqual(Place.coerce("latitude", "4.5"), 4.5)
+        self.assertEqual(Place.coerce("name", "42"), "42")
+        self.assertEqual(Place.coerce("amenity_ids", "['a', 'b']"), ["a", "b"])
+        self.assertEqual(Place.coerce("amenity_ids", "a"), "a")
+        with self.assertRaises(ValueError):
+            Place.coerce("number_rooms", "many")
+        with self.assertRaises(ValueError):
+            Place.coerce("latitude", "north")
+        self.assertEqual(Place.coerce("color", "7"), 7)
+        self.assertEqual(Place.coerce("color", "red"), "red")
+        self.assertEqual(Place.coerce("color", "__import__('os')"),
+                         "__import__('os')")
+        self.assertEqual(Place.coerce("number_rooms", 3), 3)
+
     def test_str(self):
         """
         Test for string representation
@@ -8,6 +8,7 @@ import unittest
 from datetime import datetime
 from time import sleep
 from models.city import City
+from models.place import Place
 
 
 class CityCreationTests(unittest.TestCase):
@@ -193,6 +194,21 @@ class CityToDictTests(unittest.TestCase):
             city_instance.to_dict(None)
 
 
+
+class CityRelationshipTests(unittest.TestCase):
+    """
+    Tests for the relationship properties of the City class.
+    """
+
+    def test_places(self):
+        cy = City()
+        pl = Place()
+        pl.city_id = cy.id
+        self.assertEqual([pl], cy.places)
+        models.storage.delete(pl)
+        self.assertEqual([], cy.places)
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -8,6 +8,8 @@ import unittest
 from datetime import datetime
 from time import sleep
 from models.place import Place
+from models.amenity import Amenity
+from models.review import Review
 
 
 class TestPlaceCreation(unittest.TestCase):
@@ -278,6 +280,26 @@ class TestPlaceToDictMethod(unittest.TestCase):
             place_instance.to_dict(None)
 
 
+
+class TestPlaceRelationships(unittest.TestCase):
+    """
+    Tests for the relationship properties of the Place class.
+    """
+
+    def test_reviews(self):
+        place_instance = Place()
+        review_instance = Review()
+        review_instance.place_id = place_instance.id
+        self.assertEqual([review_instance], place_instance.reviews)
+
+    def test_amenities(self):
+        place_instance = Place()
+        wifi = Amenity()
+        pool = Amenity()
+        place_instance.amenity_ids = [wifi.id, "missing", pool.id]
+        self.assertEqual([wifi, pool], place_instance.amenities)
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -8,6 +8,7 @@ import unittest
 from datetime import datetime
 from time import sleep
 from models.state import State
+from models.city import City
 
 
 class StateCreationTests(unittest.TestCase):
@@ -187,6 +188,34 @@ class StateToDictTests(unittest.TestCase):
             st_instance.to_dict(None)
 
 
+
+class StateRelationshipTests(unittest.TestCase):
+    """
+    Tests for the relationship properties of the State class.
+    """
+
+    def test_cities(self):
+        st = State()
+        cy = City()
+        cy.state_id = st.id
+        City()
+        self.assertEqual([cy], st.cities)
+
+    def test_cities_follow_state_id_changes(self):
+        st = State()
+        cy = City()
+        self.assertEqual([], st.cities)
+        cy.state_id = st.id
+        self.assertEqual([cy], st.cities)
+        cy.state_id = ""
+        self.assertEqual([], st.cities)
+
+    def test_cities_not_in_to_dict(self):
+        st = State()
+        st.cities
+        self.assertNotIn("cities", st.to_dict())
+
+
 if __name__ == "__main__":
     unittest.main()
 
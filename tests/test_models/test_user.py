@@ -8,6 +8,8 @@ import unittest
 from datetime import datetime
 from time import sleep
 from models.user import User
+from models.place import Place
+from models.review import Review
 
 
 class UserInstantiationTests(unittest.TestCase):
@@ -189,5 +191,24 @@ class UserToDictTests(unittest.TestCase):
             user_instance.to_dict(None)
 
 
+
+class UserRelationshipTests(unittest.TestCase):
+    """
+    Tests for the relationship properties of the User class.
+    """
+
+    def test_places(self):
+        us = User()
+        pl = Place()
+        pl.user_id = us.id
+        self.assertEqual([pl], us.places)
+
+    def test_reviews(self):
+        us = User()
+        rv = Review()
+        rv.user_id = us.id
+        self.assertEqual([rv], us.reviews)
+
+
 if __name__ == "__main__":
     unittest.main()